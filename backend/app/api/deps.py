@@ -3,30 +3,80 @@ from datetime import datetime
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 from starlette import status
-from app.db.session import SessionLocal
+from app.core.auth_cache import CachedPrincipal, principal_cache
+from app.core.config import get_settings
+from app.core.read_routing import recent_writers
+from app.core.revocation import revocation_list
+from app.db.session import ReadSessionLocal, SessionLocal
 from app.db.models.user import User
 from app.db.models.session import Session as DbSession
-from app.db.models.driver_profile import DriverProfile
-from app.db.models.host_profile import HostProfile
 from app.security import decode_access_token
 
+settings = get_settings()
+
 security_scheme = HTTPBearer(auto_error=False)
 
 
-def get_db() -> Generator[Session, None, None]:
+def _token_subject(credentials: HTTPAuthorizationCredentials | None) -> str | None:
+    if credentials is None:
+        return None
+    try:
+        return decode_access_token(credentials.credentials).get('sub')
+    except JWTError:
+        return None
+
+
+def get_db(
+    credentials: HTTPAuthorizationCredentials | None = Depends(security_scheme)
+) -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+        if db.info.pop('committed', False):
+            user_id = _token_subject(credentials)
+            if user_id:
+                recent_writers.mark(user_id)
+
+
+def get_read_db(
+    credentials: HTTPAuthorizationCredentials | None = Depends(security_scheme)
+) -> Generator[Session, None, None]:
+    """Session for read-only routes: the replica, unless this user wrote moments ago."""
+    factory = ReadSessionLocal
+    if recent_writers.any_recent():
+        user_id = _token_subject(credentials)
+        if user_id and recent_writers.is_recent(user_id):
+            factory = SessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials | None = Depends(security_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+def _snapshot_user(user: User) -> dict:
+    snapshot = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+    snapshot['permissions'] = list(snapshot['permissions'] or [])
+    return snapshot
+
+
+def _user_from_snapshot(db: Session, snapshot: dict) -> User:
+    user = User(**{**snapshot, 'permissions': list(snapshot['permissions'])})
+    # Attach as an already-persistent row so routes can read and modify it
+    # exactly as if it had just been loaded, without a SELECT.
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+
+def get_access_claims(
+    credentials: HTTPAuthorizationCredentials | None = Depends(security_scheme)
+) -> dict:
     if credentials is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -42,13 +92,27 @@ def get_current_user(
             detail={'code': 'UNAUTHORIZED', 'message': 'Invalid or expired access token.'}
         )
 
-    user_id = payload.get('sub')
-    session_id = payload.get('sid')
-    if not user_id or not session_id:
+    if not payload.get('sub') or not payload.get('sid'):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail={'code': 'UNAUTHORIZED', 'message': 'Invalid access token payload.'}
         )
+    return payload
+
+
+def get_current_user(
+    claims: dict = Depends(get_access_claims),
+    db: Session = Depends(get_db)
+) -> User:
+    user_id = claims['sub']
+    session_id = claims['sid']
+    if settings.auth_stateless:
+        return _get_stateless_user(claims, db)
+
+    cached = principal_cache.get(session_id)
+    if cached and cached.user_id == user_id and cached.session_expires_at > datetime.utcnow():
+        existing = db.identity_map.get(db.identity_key(User, user_id))
+        return existing if existing is not None else _user_from_snapshot(db, cached.user)
 
     session = db.query(DbSession).filter(DbSession.id == session_id).first()
     if not session or session.revoked_at or session.expires_at <= datetime.utcnow():
@@ -70,6 +134,42 @@ def get_current_user(
             detail={'code': 'UNAUTHORIZED', 'message': 'User not found for session.'}
         )
 
+    principal_cache.put(session_id, CachedPrincipal(
+        user_id=user.id,
+        session_expires_at=session.expires_at,
+        user=_snapshot_user(user)
+    ))
+    return user
+
+
+def _get_stateless_user(claims: dict, db: Session) -> User:
+    user_id = claims['sub']
+    session_id = claims['sid']
+    revocation_list.sync(db)
+    if revocation_list.is_revoked(session_id):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={'code': 'UNAUTHORIZED', 'message': 'Session is no longer valid.'}
+        )
+
+    token_expires_at = datetime.utcfromtimestamp(claims['exp'])
+    cached = principal_cache.get(session_id)
+    if cached and cached.user_id == user_id:
+        existing = db.identity_map.get(db.identity_key(User, user_id))
+        return existing if existing is not None else _user_from_snapshot(db, cached.user)
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={'code': 'UNAUTHORIZED', 'message': 'User not found for session.'}
+        )
+
+    principal_cache.put(session_id, CachedPrincipal(
+        user_id=user.id,
+        session_expires_at=token_expires_at,
+        user=_snapshot_user(user)
+    ))
     return user
 
 
@@ -85,14 +185,11 @@ def require_role(*roles: List[str]):
     return dependency
 
 
-def require_driver_profile(
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-) -> User:
+def require_driver_profile(user: User = Depends(get_current_user)) -> User:
+    # Profile completeness lives on the user row get_current_user already loaded.
     if user.role == 'admin':
         return user
-    profile = db.query(DriverProfile).filter(DriverProfile.user_id == user.id).first()
-    if not profile:
+    if not user.driver_profile_complete:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail={'code': 'PROFILE_INCOMPLETE', 'message': 'Complete your driver profile to continue.'}
@@ -100,14 +197,10 @@ def require_driver_profile(
     return user
 
 
-def require_host_profile(
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-) -> User:
+def require_host_profile(user: User = Depends(get_current_user)) -> User:
     if user.role == 'admin':
         return user
-    profile = db.query(HostProfile).filter(HostProfile.user_id == user.id).first()
-    if not profile:
+    if not user.host_profile_complete:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail={'code': 'PROFILE_INCOMPLETE', 'message': 'Complete your host profile to continue.'}
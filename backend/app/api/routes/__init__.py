@@ -1,3 +1,3 @@
-from app.api.routes import auth, users, host, driver, profile
+from app.api.routes import auth, users, host, driver, profile, admin
 
-__all__ = ['auth', 'users', 'host', 'driver', 'profile']
+__all__ = ['auth', 'users', 'host', 'driver', 'profile', 'admin']
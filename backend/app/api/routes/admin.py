@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Query
+from starlette import status
+from app.api.deps import require_role
+from app.core.slow_queries import slow_query_log
+from app.db.models.user import User
+from app.models.admin import SlowQueryList, SlowQueryOut
+
+router = APIRouter(prefix='/api/admin', tags=['admin'])
+
+
+@router.get('/slow-queries', response_model=SlowQueryList)
+def list_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    admin_user: User = Depends(require_role('admin'))
+) -> SlowQueryList:
+    """Slowest statements seen by this worker, ordered by total time."""
+    return SlowQueryList(
+        threshold_ms=slow_query_log.threshold_ms,
+        data=[
+            SlowQueryOut(
+                statement=entry.statement,
+                count=entry.count,
+                total_ms=round(entry.total_ms, 1),
+                mean_ms=round(entry.total_ms / entry.count, 1),
+                max_ms=round(entry.max_ms, 1),
+                routes=entry.routes,
+                plan=entry.plan
+            )
+            for entry in slow_query_log.top(limit)
+        ]
+    )
+
+
+@router.delete('/slow-queries', status_code=status.HTTP_204_NO_CONTENT)
+def clear_slow_queries(admin_user: User = Depends(require_role('admin'))) -> None:
+    slow_query_log.clear()
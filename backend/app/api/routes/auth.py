@@ -1,11 +1,15 @@
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from starlette import status
+from starlette.concurrency import run_in_threadpool
 from app.api.deps import get_db, get_current_user
-from app.api.utils.users import build_user_out
+from app.api.utils.users import build_user_out, issue_access_token, revoke_user_sessions
+from app.core.auth_cache import principal_cache
 from app.core.config import get_settings
-from app.core.mailer import send_password_reset_email, send_verification_email
+from app.core.revocation import revocation_list
+from app.core.mailer import drain_outbox, queue_password_reset_email, queue_verification_email
+from app.core.rate_limit import rate_limit
 from app.db.models.email_verification import EmailVerificationToken
 from app.db.models.password_reset import PasswordResetToken
 from app.db.models.session import Session as DbSession
@@ -23,36 +27,50 @@ from app.models.auth import (
     TokenResponse
 )
 from app.models.user import UserOut, UserProfileUpdate
-from app.security import create_access_token, generate_token, hash_password, hash_token, verify_password
+from app.security import (
+    generate_token,
+    hash_password_async,
+    hash_token,
+    verify_password_and_rehash_async
+)
 
 settings = get_settings()
 
 router = APIRouter(prefix='/api/auth', tags=['auth'])
 
 
-@router.post(
-    '/register',
-    response_model=AuthResponse,
-    status_code=status.HTTP_201_CREATED
-)
-async def register(
-    payload: RegisterRequest,
-    request: Request,
-    db: Session = Depends(get_db)
-) -> AuthResponse:
-    existing = db.query(User).filter(
-        (User.email == payload.email.lower()) | (User.username == payload.username)
-    ).first()
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail={'code': 'CONFLICT', 'message': 'Username or email already exists.'}
-        )
+def _email_or_username_taken(db: Session, email: str, username: str) -> bool:
+    return db.query(User.id).filter((User.email == email) | (User.username == username)).first() is not None
 
+
+def _open_session(db: Session, user: User, request: Request) -> tuple[DbSession, str]:
+    refresh_token = generate_token()
+    session = DbSession(
+        user_id=user.id,
+        refresh_token_hash=hash_token(refresh_token),
+        user_agent=request.headers.get('user-agent'),
+        ip_address=request.client.host if request.client else None,
+        expires_at=datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days),
+        last_used_at=datetime.utcnow()
+    )
+    db.add(session)
+    return session, refresh_token
+
+
+def _auth_response(user: User, session: DbSession, refresh_token: str) -> AuthResponse:
+    tokens = TokenResponse(
+        access_token=issue_access_token(user, session.id),
+        refresh_token=refresh_token,
+        expires_in=settings.access_token_expire_minutes * 60
+    )
+    return AuthResponse(user=build_user_out(user), tokens=tokens)
+
+
+def _create_account(db: Session, payload: RegisterRequest, password_hash: str, request: Request) -> AuthResponse:
     user = User(
         username=payload.username.strip(),
         email=payload.email.lower(),
-        password_hash=hash_password(payload.password),
+        password_hash=password_hash,
         phone_number=payload.phone_number.strip(),
         role='member',
         permissions=[]
@@ -61,87 +79,96 @@ async def register(
     db.flush()
 
     verification_token = generate_token()
+    verification_hash = hash_token(verification_token)
     db.add(EmailVerificationToken(
         user_id=user.id,
-        token_hash=hash_token(verification_token),
+        token_hash=verification_hash,
         expires_at=datetime.utcnow() + timedelta(hours=24)
     ))
-
-    refresh_token = generate_token()
-    refresh_token_hash = hash_token(refresh_token)
-    session = DbSession(
-        user_id=user.id,
-        refresh_token_hash=refresh_token_hash,
-        user_agent=request.headers.get('user-agent'),
-        ip_address=request.client.host if request.client else None,
-        expires_at=datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days),
-        last_used_at=datetime.utcnow()
+    verification_link = f'{settings.app_base_url}/api/auth/verify-email?token={verification_token}'
+    queue_verification_email(
+        db,
+        to=user.email,
+        username=user.username,
+        link=verification_link,
+        token_hash=verification_hash
     )
-    db.add(session)
+
+    session, refresh_token = _open_session(db, user, request)
     db.commit()
     db.refresh(user)
+    return _auth_response(user, session, refresh_token)
 
-    verification_link = f'{settings.app_base_url}/api/auth/verify-email?token={verification_token}'
-    send_verification_email(to=user.email, username=user.username, link=verification_link)
 
-    tokens = TokenResponse(
-        access_token=create_access_token({
-            'sub': user.id,
-            'sid': session.id,
-            'role': user.role,
-            'permissions': user.permissions
-        }),
-        refresh_token=refresh_token,
-        expires_in=settings.access_token_expire_minutes * 60
-    )
+@router.post(
+    '/register',
+    response_model=AuthResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit(settings.rate_limit_register_max, settings.rate_limit_window_seconds))]
+)
+async def register(
+    payload: RegisterRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+) -> AuthResponse:
+    # Database work runs on the threadpool; only password hashing is awaited here.
+    if await run_in_threadpool(_email_or_username_taken, db, payload.email.lower(), payload.username):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={'code': 'CONFLICT', 'message': 'Username or email already exists.'}
+        )
+
+    # Hand the pooled connection back while bcrypt runs off the event loop.
+    db.close()
+    password_hash = await hash_password_async(payload.password)
+    response = await run_in_threadpool(_create_account, db, payload, password_hash, request)
+    background_tasks.add_task(drain_outbox)
+    return response
+
 
-    return AuthResponse(user=build_user_out(db, user), tokens=tokens)
+def _find_user_by_email(db: Session, email: str) -> User | None:
+    return db.query(User).filter(User.email == email).first()
+
+
+def _complete_login(db: Session, user: User, upgraded_hash: str | None, request: Request) -> AuthResponse:
+    if upgraded_hash:
+        # The stored hash used a different bcrypt cost; replace it while we have the plaintext.
+        db.add(user)
+        user.password_hash = upgraded_hash
+    session, refresh_token = _open_session(db, user, request)
+    db.commit()
+    if upgraded_hash:
+        principal_cache.invalidate_user(user.id)
+    return _auth_response(user, session, refresh_token)
 
 
 @router.post(
     '/login',
-    response_model=AuthResponse
+    response_model=AuthResponse,
+    dependencies=[Depends(rate_limit(settings.rate_limit_login_max, settings.rate_limit_window_seconds))]
 )
 async def login(
     payload: LoginRequest,
     request: Request,
     db: Session = Depends(get_db)
 ) -> AuthResponse:
-    user = db.query(User).filter(User.email == payload.email.lower()).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+    user = await run_in_threadpool(_find_user_by_email, db, payload.email.lower())
+    db.close()
+    verified, upgraded_hash = False, None
+    if user:
+        verified, upgraded_hash = await verify_password_and_rehash_async(payload.password, user.password_hash)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail={'code': 'INVALID_CREDENTIALS', 'message': 'Invalid email or password.'}
         )
 
-    refresh_token = generate_token()
-    session = DbSession(
-        user_id=user.id,
-        refresh_token_hash=hash_token(refresh_token),
-        user_agent=request.headers.get('user-agent'),
-        ip_address=request.client.host if request.client else None,
-        expires_at=datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days),
-        last_used_at=datetime.utcnow()
-    )
-    db.add(session)
-    db.commit()
-
-    tokens = TokenResponse(
-        access_token=create_access_token({
-            'sub': user.id,
-            'sid': session.id,
-            'role': user.role,
-            'permissions': user.permissions
-        }),
-        refresh_token=refresh_token,
-        expires_in=settings.access_token_expire_minutes * 60
-    )
-
-    return AuthResponse(user=build_user_out(db, user), tokens=tokens)
+    return await run_in_threadpool(_complete_login, db, user, upgraded_hash, request)
 
 
 @router.post('/refresh', response_model=AuthResponse)
-async def refresh(payload: RefreshRequest, db: Session = Depends(get_db)) -> AuthResponse:
+def refresh(payload: RefreshRequest, db: Session = Depends(get_db)) -> AuthResponse:
     refresh_hash = hash_token(payload.refresh_token)
     session = db.query(DbSession).filter(DbSession.refresh_token_hash == refresh_hash).first()
 
@@ -165,33 +192,30 @@ async def refresh(payload: RefreshRequest, db: Session = Depends(get_db)) -> Aut
     db.commit()
 
     tokens = TokenResponse(
-        access_token=create_access_token({
-            'sub': user.id,
-            'sid': session.id,
-            'role': user.role,
-            'permissions': user.permissions
-        }),
+        access_token=issue_access_token(user, session.id),
         refresh_token=new_refresh_token,
         expires_in=settings.access_token_expire_minutes * 60
     )
 
-    return AuthResponse(user=build_user_out(db, user), tokens=tokens)
+    return AuthResponse(user=build_user_out(user), tokens=tokens)
 
 
 @router.post('/logout', response_model=MessageResponse)
-async def logout(payload: LogoutRequest, db: Session = Depends(get_db)) -> MessageResponse:
+def logout(payload: LogoutRequest, db: Session = Depends(get_db)) -> MessageResponse:
     refresh_hash = hash_token(payload.refresh_token)
     session = db.query(DbSession).filter(DbSession.refresh_token_hash == refresh_hash).first()
 
     if session and not session.revoked_at:
         session.revoked_at = datetime.utcnow()
         db.commit()
+        revocation_list.revoke([session.id], session.revoked_at)
+        principal_cache.invalidate_session(session.id)
 
     return MessageResponse(success=True)
 
 
 @router.get('/verify-email', response_model=EmailVerificationResponse)
-async def verify_email(token: str, db: Session = Depends(get_db)) -> EmailVerificationResponse:
+def verify_email(token: str, db: Session = Depends(get_db)) -> EmailVerificationResponse:
     token_hash = hash_token(token)
     record = db.query(EmailVerificationToken).filter(
         EmailVerificationToken.token_hash == token_hash,
@@ -215,38 +239,39 @@ async def verify_email(token: str, db: Session = Depends(get_db)) -> EmailVerifi
     record.used_at = datetime.utcnow()
     db.commit()
 
-    return EmailVerificationResponse(user=build_user_out(db, user))
+    return EmailVerificationResponse(user=build_user_out(user))
 
 
 @router.post(
     '/forgot-password',
-    response_model=MessageResponse
+    response_model=MessageResponse,
+    dependencies=[Depends(rate_limit(settings.rate_limit_reset_max, settings.rate_limit_window_seconds))]
 )
-async def forgot_password(payload: ForgotPasswordRequest, db: Session = Depends(get_db)) -> MessageResponse:
+def forgot_password(
+    payload: ForgotPasswordRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+) -> MessageResponse:
     user = db.query(User).filter(User.email == payload.email.lower()).first()
     if not user:
         return MessageResponse(success=True)
 
     reset_token = generate_token()
+    reset_hash = hash_token(reset_token)
     db.add(PasswordResetToken(
         user_id=user.id,
-        token_hash=hash_token(reset_token),
+        token_hash=reset_hash,
         expires_at=datetime.utcnow() + timedelta(hours=2)
     ))
-    db.commit()
-
     reset_link = f'{settings.app_base_url}/reset-password?token={reset_token}'
-    send_password_reset_email(to=user.email, link=reset_link)
+    queue_password_reset_email(db, to=user.email, link=reset_link, token_hash=reset_hash)
+    db.commit()
+    background_tasks.add_task(drain_outbox)
 
     return MessageResponse(success=True)
 
 
-@router.post(
-    '/reset-password',
-    response_model=MessageResponse
-)
-async def reset_password(payload: ResetPasswordRequest, db: Session = Depends(get_db)) -> MessageResponse:
-    token_hash = hash_token(payload.token)
+def _find_password_reset(db: Session, token_hash: str) -> tuple[PasswordResetToken, User]:
     record = db.query(PasswordResetToken).filter(
         PasswordResetToken.token_hash == token_hash,
         PasswordResetToken.used_at.is_(None)
@@ -264,45 +289,42 @@ async def reset_password(payload: ResetPasswordRequest, db: Session = Depends(ge
             status_code=status.HTTP_404_NOT_FOUND,
             detail={'code': 'NOT_FOUND', 'message': 'User not found.'}
         )
+    return record, user
+
 
-    user.password_hash = hash_password(payload.password)
+def _apply_password_reset(db: Session, record: PasswordResetToken, user: User, password_hash: str) -> None:
+    db.add_all([user, record])
+    user.password_hash = password_hash
     record.used_at = datetime.utcnow()
 
-    db.query(DbSession).filter(DbSession.user_id == user.id, DbSession.revoked_at.is_(None)).update({
-        DbSession.revoked_at: datetime.utcnow()
-    })
+    revoked = revoke_user_sessions(db, user.id)
     db.commit()
+    revocation_list.revoke(revoked)
+    principal_cache.invalidate_user(user.id)
+
+
+@router.post(
+    '/reset-password',
+    response_model=MessageResponse,
+    dependencies=[Depends(rate_limit(settings.rate_limit_reset_max, settings.rate_limit_window_seconds))]
+)
+async def reset_password(payload: ResetPasswordRequest, db: Session = Depends(get_db)) -> MessageResponse:
+    record, user = await run_in_threadpool(_find_password_reset, db, hash_token(payload.token))
+    db.close()
+    password_hash = await hash_password_async(payload.password)
+    await run_in_threadpool(_apply_password_reset, db, record, user, password_hash)
 
     return MessageResponse(success=True)
 
 
 @router.get('/me', response_model=UserOut)
-async def me(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-) -> UserOut:
-    return build_user_out(db=db, user=current_user)
+def me(current_user: User = Depends(get_current_user)) -> UserOut:
+    return build_user_out(current_user)
 
 
-@router.patch('/me', response_model=UserOut)
-async def update_me(
-    payload: UserProfileUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-) -> UserOut:
-    """
-    Update current user's profile details.
-    Allowed fields: username, email, phone_number, password
-    """
-    # Get only the fields that were actually provided
-    updates = payload.model_dump(exclude_unset=True)
-    
-    if not updates:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={'code': 'VALIDATION_ERROR', 'message': 'At least one field is required.'}
-        )
-    
+def _apply_profile_update(db: Session, current_user: User, updates: dict, password_hash: str | None) -> UserOut:
+    db.add(current_user)
+
     # Check for username conflicts
     if 'username' in updates and updates['username'] != current_user.username:
         existing = db.query(User).filter(
@@ -335,17 +357,44 @@ async def update_me(
         current_user.phone_number = updates['phone_number'].strip()
     
     # Update password
+    revoked = []
     if 'password' in updates:
-        current_user.password_hash = hash_password(updates['password'])
+        current_user.password_hash = password_hash
         
         # Revoke all other sessions when password changes
-        db.query(DbSession).filter(
-            DbSession.user_id == current_user.id,
-            DbSession.revoked_at.is_(None)
-        ).update({DbSession.revoked_at: datetime.utcnow()})
+        revoked = revoke_user_sessions(db, current_user.id)
     
     current_user.updated_at = datetime.utcnow()
     db.commit()
+    revocation_list.revoke(revoked)
+    principal_cache.invalidate_user(current_user.id)
     db.refresh(current_user)
     
-    return build_user_out(db=db, user=current_user)
+    return build_user_out(current_user)
+
+
+@router.patch('/me', response_model=UserOut)
+async def update_me(
+    payload: UserProfileUpdate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> UserOut:
+    """
+    Update current user's profile details.
+    Allowed fields: username, email, phone_number, password
+    """
+    # Get only the fields that were actually provided
+    updates = payload.model_dump(exclude_unset=True)
+    
+    if not updates:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={'code': 'VALIDATION_ERROR', 'message': 'At least one field is required.'}
+        )
+    
+    password_hash = None
+    if 'password' in updates:
+        db.close()
+        password_hash = await hash_password_async(updates['password'])
+
+    return await run_in_threadpool(_apply_profile_update, db, current_user, updates, password_hash)
@@ -1,13 +1,18 @@
+import asyncio
+import json
+import logging
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from starlette import status
-from app.api.deps import get_db, require_driver_profile
+from app.api.deps import get_db, get_read_db, require_driver_profile
+from app.api.utils.bookings import NEXT_CURSOR_HEADER, booking_page, completed_rating_totals
 from app.api.utils.stations import build_station_out, distance_km, parse_power_kw
+from app.core.realtime import Subscriber, Viewport, station_events, station_slots_event
 from app.db.models.booking import Booking
 from app.db.models.station import Station
 from app.db.models.user import User
-from app.db.seed import ensure_global_demo_stations
 from app.models.booking import DriverBookingOut
 from app.models.driver import (
     BookingConfig,
@@ -18,11 +23,14 @@ from app.models.driver import (
     DriverLocation,
     DriverStatusOption,
     DriverVehicleTypeOption,
-    StationReview
+    StationReview,
+    StationStreamSubscription
 )
 from app.models.station import StationOut
 from app.models.booking import CompleteBookingRequest
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix='/api/driver', tags=['driver'])
 
 DEFAULT_LOCATION = {'name': 'Pune', 'lat': 18.5204, 'lng': 73.8567}
@@ -104,7 +112,7 @@ async def driver_config() -> DriverConfig:
 
 
 @router.get('/search', response_model=list[StationOut])
-async def search_stations(
+def search_stations(
     lat: float = Query(...),
     lng: float = Query(...),
     radius_km: float = Query(SEARCH_RADIUS_KM, ge=0.1, le=100.0),
@@ -112,9 +120,8 @@ async def search_stations(
     vehicle_type: str | None = Query(default=None),
     tags: list[str] | None = Query(default=None),
     q: str | None = Query(default=None),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> list[StationOut]:
-    ensure_global_demo_stations(db)
     stations = db.query(Station).all()
     print(f"🔍 Total stations in DB: {len(stations)}")
 
@@ -182,17 +189,25 @@ async def search_stations(
 
 
 @router.get('/bookings', response_model=list[DriverBookingOut])
-async def list_driver_bookings(
+def list_driver_bookings(
+    response: Response,
+    limit: int | None = Query(default=None, ge=1, le=200),
+    cursor: str | None = Query(default=None),
     current_user: User = Depends(require_driver_profile),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> list[DriverBookingOut]:
-    rows = db.query(Booking, Station, User).join(
-        Station, Booking.station_id == Station.id
-    ).join(
-        User, Station.host_id == User.id
-    ).filter(
-        Booking.driver_id == current_user.id
-    ).order_by(Booking.created_at.desc()).all()
+    """Newest bookings first. Pass ``limit`` to page; follow the ``X-Next-Cursor`` header as ``cursor``."""
+    rows, next_cursor = booking_page(
+        lambda model: db.query(model, Station, User).join(
+            Station, model.station_id == Station.id
+        ).join(
+            User, Station.host_id == User.id
+        ).filter(model.driver_id == current_user.id),
+        limit,
+        cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
     results: list[DriverBookingOut] = []
     for booking, station, host in rows:
@@ -220,7 +235,7 @@ async def list_driver_bookings(
 
 
 @router.post('/bookings/complete', response_model=DriverBookingOut)
-async def complete_booking(
+def complete_booking(
     payload: CompleteBookingRequest,
     current_user: User = Depends(require_driver_profile),
     db: Session = Depends(get_db)
@@ -274,16 +289,10 @@ async def complete_booking(
         )
 
     # Update station review count and average rating
-    completed_bookings = db.query(Booking).filter(
-        Booking.station_id == station.id,
-        Booking.status == 'COMPLETED',
-        Booking.rating.isnot(None)
-    ).all()
-    
-    if completed_bookings:
-        total_rating = sum(b.rating for b in completed_bookings if b.rating)
-        station.review_count = len(completed_bookings)
-        station.rating = round(total_rating / len(completed_bookings), 1)
+    review_count, total_rating = completed_rating_totals(db, station.id)
+    if review_count:
+        station.review_count = review_count
+        station.rating = round(total_rating / review_count, 1)
 
     host = db.query(User).filter(User.id == station.host_id).first()
     if not host:
@@ -295,6 +304,9 @@ async def complete_booking(
     db.commit()
     db.refresh(station)
 
+    if booking.start_time:
+        station_events.publish(station_slots_event(station, released=[booking.start_time]))
+
     contact_number = station.phone_number or host.phone_number
     return DriverBookingOut(
         id=booking.id,
@@ -317,7 +329,7 @@ async def complete_booking(
 
 
 @router.post('/bookings', response_model=StationOut)
-async def create_booking(
+def create_booking(
     payload: BookingRequest,
     current_user: User = Depends(require_driver_profile),
     db: Session = Depends(get_db)
@@ -375,6 +387,7 @@ async def create_booking(
 
     db.commit()
     db.refresh(station)
+    station_events.publish(station_slots_event(station, booked=[payload.start_time]))
 
     distance_value = None
     if payload.user_lat is not None and payload.user_lng is not None:
@@ -385,16 +398,25 @@ async def create_booking(
 
 
 @router.get('/stations/{station_id}/reviews', response_model=list[StationReview])
-async def get_station_reviews(
+def get_station_reviews(
     station_id: str,
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: int | None = Query(default=None, ge=1, le=200),
+    cursor: str | None = Query(default=None),
+    db: Session = Depends(get_read_db)
 ) -> list[StationReview]:
-    """Get all reviews for a specific station"""
-    reviews = db.query(Booking).filter(
-        Booking.station_id == station_id,
-        Booking.status == 'COMPLETED',
-        Booking.rating.isnot(None)
-    ).order_by(Booking.created_at.desc()).all()
+    """Get reviews for a specific station, newest first; ``limit``/``cursor`` page like the booking history"""
+    reviews, next_cursor = booking_page(
+        lambda model: db.query(model).filter(
+            model.station_id == station_id,
+            model.status == 'COMPLETED',
+            model.rating.isnot(None)
+        ),
+        limit,
+        cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
     return [
         StationReview(
@@ -405,3 +427,78 @@ async def get_station_reviews(
         )
         for booking in reviews
     ]
+
+
+def _stream_message(payload: dict) -> str:
+    return json.dumps(payload, separators=(',', ':'))
+
+
+async def _pump_station_events(websocket: WebSocket, subscriber: Subscriber) -> None:
+    while True:
+        message = await subscriber.queue.get()
+        try:
+            if message is None:
+                await websocket.close(code=1013)
+                return
+            await websocket.send_text(message)
+        except (WebSocketDisconnect, RuntimeError, OSError) as exc:
+            # The client went away mid-send; the receive side sees the disconnect too.
+            logger.debug('Station stream send failed: %s', exc)
+            return
+
+
+async def _receive_subscriptions(websocket: WebSocket, subscriber: Subscriber) -> None:
+    while True:
+        try:
+            raw = await websocket.receive_text()
+        except WebSocketDisconnect:
+            return
+        try:
+            subscription = StationStreamSubscription.model_validate(json.loads(raw))
+        except (ValueError, ValidationError):
+            subscriber.deliver(_stream_message({
+                'type': 'error',
+                'code': 'VALIDATION_ERROR',
+                'message': 'Invalid subscription message.'
+            }))
+            continue
+
+        if subscription.action == 'unsubscribe':
+            station_events.subscribe(subscriber, [], None)
+        else:
+            viewport = None
+            if subscription.viewport is not None:
+                viewport = Viewport(**subscription.viewport.model_dump())
+            station_events.subscribe(subscriber, subscription.station_ids, viewport)
+
+        subscriber.deliver(_stream_message({
+            'type': 'subscribed',
+            'stationIds': sorted(subscriber.station_ids),
+            'viewport': subscription.viewport.model_dump(by_alias=True) if subscriber.viewport else None
+        }))
+
+
+@router.websocket('/stream')
+async def station_stream(websocket: WebSocket) -> None:
+    """
+    Push station status and booked-slot deltas to subscribed clients.
+    Clients send {"action": "subscribe", "stationIds": [...], "viewport": {...}};
+    each subscribe message replaces the previous subscription.
+    """
+    await websocket.accept()
+    subscriber = station_events.connect(asyncio.get_running_loop())
+    tasks = {
+        asyncio.create_task(_pump_station_events(websocket, subscriber)),
+        asyncio.create_task(_receive_subscriptions(websocket, subscriber))
+    }
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() is not None:
+                logger.error('Station stream task failed', exc_info=task.exception())
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Awaiting both retrieves their outcome, so no exception goes unobserved.
+        await asyncio.gather(*tasks, return_exceptions=True)
+        station_events.disconnect(subscriber)
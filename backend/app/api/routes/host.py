@@ -1,14 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from datetime import datetime
+from typing import Iterable, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File
+from pydantic import ValidationError
+from sqlalchemy import func, insert, update
 from sqlalchemy.orm import Session
 from starlette import status
+from starlette.concurrency import run_in_threadpool
 from app.api.deps import get_db, require_host_profile, require_role
+from app.api.utils.bookings import NEXT_CURSOR_HEADER, booking_page
+from app.api.utils.imports import detect_import_format, format_validation_error, iter_import_records, spool_request_body
 from app.api.utils.stations import build_station_out
-from app.db.models.booking import Booking
+from app.core.config import get_settings
+from app.core.realtime import station_events, station_slots_event, station_status_event
+from app.db.models.booking import Booking, BookingArchive
 from app.db.models.station import Station
 from app.db.models.user import User
 from app.db.seed import ensure_demo_stations_for_host
 from app.models.booking import HostBookingOut
-from app.models.station import HostStats, StationCreate, StationOut, StationStatus, StationUpdate
+from app.models.station import (
+    HostStats,
+    StationBulkUpdate,
+    StationBulkUpdateResult,
+    StationCreate,
+    StationImportResponse,
+    StationImportRow,
+    StationOut,
+    StationStatus,
+    StationUpdate
+)
 
 from typing import List
 import uuid
@@ -16,11 +35,15 @@ from io import BytesIO
 from app.api.utils.ai_service import analyze_multiple_images, optimize_image_for_gemini
 from app.api.utils.s3_service import upload_file_to_s3
 
+settings = get_settings()
+
 router = APIRouter(prefix='/api/host', tags=['host'])
 
+DEFAULT_STATION_IMAGE = 'https://picsum.photos/400/300?random=99'
+
 
 @router.get('/stats', response_model=HostStats)
-async def get_stats(
+def get_stats(
     current_user: User = Depends(require_host_profile),
     db: Session = Depends(get_db)
 ) -> HostStats:
@@ -30,18 +53,18 @@ async def get_stats(
     if not stations:
         return HostStats(total_earnings=0, active_bookings=0, station_health=0)
 
-    # Calculate total earnings from COMPLETED bookings
+    # Calculate total earnings from COMPLETED bookings, archived ones included
     station_ids = [station.id for station in stations]
-    completed_bookings = db.query(Booking, Station).join(
-        Station, Booking.station_id == Station.id
-    ).filter(
-        Booking.host_id == current_user.id,
-        Booking.status == 'COMPLETED',
-        Booking.station_id.in_(station_ids)
-    ).all()
-    
-    total_earnings = sum(station.price_per_hour for _, station in completed_bookings)
-    
+    total_earnings = 0
+    for model in (Booking, BookingArchive):
+        total_earnings += db.query(func.coalesce(func.sum(Station.price_per_hour), 0)).select_from(model).join(
+            Station, model.station_id == Station.id
+        ).filter(
+            model.host_id == current_user.id,
+            model.status == 'COMPLETED',
+            model.station_id.in_(station_ids)
+        ).scalar()
+
     active_bookings = db.query(Booking).filter(
         Booking.host_id == current_user.id,
         Booking.status == 'ACTIVE'
@@ -57,7 +80,7 @@ async def get_stats(
 
 
 @router.get('/stations', response_model=list[StationOut])
-async def list_stations(
+def list_stations(
     current_user: User = Depends(require_host_profile),
     db: Session = Depends(get_db)
 ) -> list[StationOut]:
@@ -69,14 +92,14 @@ async def list_stations(
 
 
 @router.post('/stations', response_model=StationOut, status_code=status.HTTP_201_CREATED)
-async def create_station(
+def create_station(
     payload: StationCreate,
     current_user: User = Depends(require_host_profile),
     db: Session = Depends(get_db)
 ) -> StationOut:
     image = payload.image.strip() if payload.image else ''
     if not image:
-        image = 'https://picsum.photos/400/300?random=99'
+        image = DEFAULT_STATION_IMAGE
     station_phone = payload.phone_number.strip() if payload.phone_number else current_user.phone_number
 
     station = Station(
@@ -105,16 +128,139 @@ async def create_station(
     return build_station_out(station)
 
 
+def _station_import_values(payload: StationCreate, host: dict, now: datetime) -> dict:
+    # Same defaults as create_station, as plain column values for executemany.
+    return {
+        'id': str(uuid.uuid4()),
+        'host_id': host['id'],
+        'host_name': host['username'],
+        'title': payload.title.strip(),
+        'location': payload.location.strip(),
+        'rating': payload.rating,
+        'review_count': payload.review_count,
+        'price_per_hour': payload.price_per_hour,
+        'status': payload.status.value,
+        'image': payload.image.strip() or DEFAULT_STATION_IMAGE,
+        'connector_type': payload.connector_type.strip(),
+        'power_output': payload.power_output.strip(),
+        'description': payload.description,
+        'lat': payload.lat,
+        'lng': payload.lng,
+        'phone_number': payload.phone_number.strip() if payload.phone_number else host['phone_number'],
+        'supported_vehicle_types': payload.supported_vehicle_types,
+        'monthly_earnings': payload.monthly_earnings,
+        'created_at': now,
+        'updated_at': now
+    }
+
+
+def _import_stations(
+    db: Session,
+    lines: Iterable[str],
+    import_format: str,
+    host: User
+) -> tuple[list[StationImportRow], list[dict]]:
+    """Validate rows as they are read and insert every full chunk before reading on."""
+    results: list[StationImportRow] = []
+    created: list[dict] = []
+    pending: list[tuple[int, dict]] = []
+    now = datetime.utcnow()
+    # Read once: committing a chunk expires the ORM instance.
+    host_values = {'id': host.id, 'username': host.username, 'phone_number': host.phone_number}
+
+    def flush() -> None:
+        db.execute(insert(Station), [values for _, values in pending])
+        db.commit()
+        results.extend(
+            StationImportRow(row=row, status='created', id=values['id'], title=values['title'])
+            for row, values in pending
+        )
+        created.extend(values for _, values in pending)
+        pending.clear()
+
+    for row, record, error in iter_import_records(lines, import_format):
+        if error:
+            results.append(StationImportRow(row=row, status='invalid', message=error))
+            continue
+        if isinstance(record.get('supportedVehicleTypes'), str):
+            record['supportedVehicleTypes'] = [
+                item.strip() for item in record['supportedVehicleTypes'].split(';') if item.strip()
+            ]
+        try:
+            payload = StationCreate.model_validate(record)
+        except ValidationError as exc:
+            results.append(StationImportRow(row=row, status='invalid', message=format_validation_error(exc.errors())))
+            continue
+        pending.append((row, _station_import_values(payload, host_values, now)))
+        if len(pending) >= settings.station_import_chunk_size:
+            flush()
+    if pending:
+        flush()
+    return results, created
+
+
+def _count_import_rows(lines: Iterable[str], import_format: str) -> int:
+    return sum(1 for _ in iter_import_records(lines, import_format))
+
+
+@router.post('/stations/import', response_model=StationImportResponse)
+async def import_stations(
+    request: Request,
+    format: Optional[str] = Query(None, pattern='^(csv|ndjson)$'),
+    current_user: User = Depends(require_host_profile),
+    db: Session = Depends(get_db)
+) -> StationImportResponse:
+    """Create stations from a CSV (with header) or NDJSON body, one station per row.
+
+    Chunks of ``STATION_IMPORT_CHUNK_SIZE`` valid rows are committed as they
+    fill, so a failure part-way leaves earlier chunks in place; the report
+    lists every row that was created.
+    """
+    import_format = detect_import_format(request.headers.get('content-type'), format)
+    # Release the connection the auth dependency used while the body streams in.
+    db.close()
+    lines = await spool_request_body(request, settings.import_spool_max_bytes, settings.import_max_bytes)
+    try:
+        # Counting first keeps an oversized file from committing anything.
+        row_count = await run_in_threadpool(_count_import_rows, lines, import_format)
+        if row_count > settings.station_import_max_rows:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail={
+                    'code': 'TOO_MANY_ROWS',
+                    'message': f'Import at most {settings.station_import_max_rows} rows per request.'
+                }
+            )
+        lines.seek(0)
+        results, created = await run_in_threadpool(_import_stations, db, lines, import_format, current_user)
+    finally:
+        lines.close()
+
+    # One batch tells open maps about every new station.
+    if created:
+        station_events.publish_many([station_status_event(Station(**values)) for values in created])
+    results.sort(key=lambda result: result.row)
+    return StationImportResponse(created=len(created), skipped=len(results) - len(created), results=results)
+
+
 @router.get('/bookings', response_model=list[HostBookingOut])
-async def list_bookings(
+def list_bookings(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
     current_user: User = Depends(require_host_profile),
     db: Session = Depends(get_db)
 ) -> list[HostBookingOut]:
-    rows = db.query(Booking, Station).join(
-        Station, Booking.station_id == Station.id
-    ).filter(
-        Booking.host_id == current_user.id
-    ).order_by(Booking.created_at.desc()).all()
+    """Newest bookings first. Pass ``limit`` to page; follow the ``X-Next-Cursor`` header as ``cursor``."""
+    rows, next_cursor = booking_page(
+        lambda model: db.query(model, Station).join(
+            Station, model.station_id == Station.id
+        ).filter(model.host_id == current_user.id),
+        limit,
+        cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
     results: list[HostBookingOut] = []
     for booking, station in rows:
@@ -135,8 +281,78 @@ async def list_bookings(
     return results
 
 
+# Declared before /stations/{station_id} so 'bulk' is not read as a station id.
+@router.patch('/stations/bulk', response_model=StationBulkUpdateResult)
+def bulk_update_stations(
+    payload: StationBulkUpdate,
+    current_user: User = Depends(require_host_profile),
+    db: Session = Depends(get_db)
+) -> StationBulkUpdateResult:
+    """Apply one status and/or price change to many stations in a single UPDATE.
+
+    Taking stations OFFLINE cancels their ACTIVE bookings with one set-based
+    statement. Ids that do not exist, or belong to another host, are
+    reported in ``notFound`` and left alone.
+    """
+    updates = payload.model_dump(exclude_unset=True, exclude={'station_ids'})
+    updates = {key: value for key, value in updates.items() if value is not None}
+    if not updates:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={'code': 'VALIDATION_ERROR', 'message': 'Provide status or pricePerHour.'}
+        )
+    if 'status' in updates:
+        updates['status'] = updates['status'].value
+
+    requested_ids = list(dict.fromkeys(payload.station_ids))
+    query = db.query(Station).filter(Station.id.in_(requested_ids))
+    if current_user.role != 'admin':
+        query = query.filter(Station.host_id == current_user.id)
+    stations = {station.id: station for station in query}
+    station_ids = list(stations)
+    if not station_ids:
+        return StationBulkUpdateResult(updated=[], not_found=requested_ids, cancelled_bookings=0)
+
+    status_update = updates.get('status')
+    status_changed = {
+        station_id for station_id, station in stations.items()
+        if status_update is not None and station.status != status_update
+    }
+    db.execute(
+        update(Station).where(Station.id.in_(station_ids)).values(**updates, updated_at=datetime.utcnow()),
+        execution_options={'synchronize_session': 'evaluate'}
+    )
+
+    released_slots: dict[str, list[str]] = {}
+    cancelled = 0
+    if status_update == StationStatus.OFFLINE.value:
+        active_bookings = db.query(Booking).filter(
+            Booking.station_id.in_(station_ids),
+            Booking.status == 'ACTIVE'
+        )
+        for station_id, start_time in active_bookings.with_entities(Booking.station_id, Booking.start_time):
+            if start_time:
+                released_slots.setdefault(station_id, []).append(start_time)
+        cancelled = active_bookings.update({Booking.status: 'CANCELLED'}, synchronize_session=False)
+
+    # Build events before commit; the updated attributes expire with it.
+    events = [station_status_event(stations[station_id]) for station_id in station_ids if station_id in status_changed]
+    events.extend(
+        station_slots_event(stations[station_id], released=slots) for station_id, slots in released_slots.items()
+    )
+    db.commit()
+    if events:
+        station_events.publish_many(events)
+
+    return StationBulkUpdateResult(
+        updated=station_ids,
+        not_found=[station_id for station_id in requested_ids if station_id not in stations],
+        cancelled_bookings=cancelled
+    )
+
+
 @router.patch('/stations/{station_id}', response_model=StationOut)
-async def update_station(
+def update_station(
     station_id: str,
     payload: StationUpdate,
     current_user: User = Depends(require_host_profile),
@@ -163,18 +379,32 @@ async def update_station(
         updates['status'] = updates['status'].value
 
     status_update = updates.get('status')
+    status_changed = status_update is not None and status_update != station.status
     for key, value in updates.items():
         setattr(station, key, value)
 
+    released_slots: list[str] = []
     if status_update == StationStatus.OFFLINE.value:
-        db.query(Booking).filter(
+        active_bookings = db.query(Booking).filter(
             Booking.station_id == station.id,
             Booking.status == 'ACTIVE'
-        ).update({Booking.status: 'CANCELLED'})
+        )
+        released_slots = [
+            start_time for (start_time,) in active_bookings.with_entities(Booking.start_time) if start_time
+        ]
+        active_bookings.update({Booking.status: 'CANCELLED'})
 
     db.commit()
     db.refresh(station)
 
+    events = []
+    if status_changed:
+        events.append(station_status_event(station))
+    if released_slots:
+        events.append(station_slots_event(station, released=released_slots))
+    if events:
+        station_events.publish_many(events)
+
     return build_station_out(station)
 
 
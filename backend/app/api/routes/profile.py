@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from starlette import status
 from app.api.deps import get_current_user, get_db
+from app.core.auth_cache import principal_cache
 from app.db.models.driver_profile import DriverProfile
 from app.db.models.host_profile import HostProfile
 from app.db.models.user import User
@@ -14,7 +15,7 @@ router = APIRouter(prefix='/api/profile', tags=['profile'])
 
 
 @router.get('/driver', response_model=DriverProfileOut)
-async def get_driver_profile(
+def get_driver_profile(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ) -> DriverProfileOut:
@@ -28,7 +29,7 @@ async def get_driver_profile(
 
 
 @router.put('/driver', response_model=DriverProfileOut)
-async def upsert_driver_profile(
+def upsert_driver_profile(
     payload: DriverProfileIn,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -51,13 +52,15 @@ async def upsert_driver_profile(
             vehicle_number=payload.vehicle_number
         )
         db.add(profile)
+    current_user.driver_profile_complete = True
     db.commit()
+    principal_cache.invalidate_user(current_user.id)
     db.refresh(profile)
     return DriverProfileOut.model_validate(profile)
 
 
 @router.get('/host', response_model=HostProfileOut)
-async def get_host_profile(
+def get_host_profile(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ) -> HostProfileOut:
@@ -71,7 +74,7 @@ async def get_host_profile(
 
 
 @router.put('/host', response_model=HostProfileOut)
-async def upsert_host_profile(
+def upsert_host_profile(
     payload: HostProfileIn,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -92,6 +95,8 @@ async def upsert_host_profile(
             parking_address=payload.parking_address
         )
         db.add(profile)
+    current_user.host_profile_complete = True
     db.commit()
+    principal_cache.invalidate_user(current_user.id)
     db.refresh(profile)
     return HostProfileOut.model_validate(profile)
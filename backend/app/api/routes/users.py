@@ -1,31 +1,87 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import uuid
+from datetime import datetime
+from typing import Iterable, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import ValidationError
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from starlette import status
+from starlette.concurrency import run_in_threadpool
 from app.api.deps import get_current_user, get_db, require_role, require_self_or_admin
+from app.api.utils.imports import detect_import_format, format_validation_error, iter_import_records, spool_request_body
+from app.api.utils.pagination import before_cursor, encode_cursor, prefix_range
+from app.api.utils.users import user_total
+from app.core.auth_cache import principal_cache
+from app.core.config import get_settings
 from app.db.models.user import User
-from app.models.user import UserCreate, UserList, UserOut, UserUpdate
-from app.security import hash_password
+from app.models.user import UserCreate, UserImportResponse, UserImportRow, UserList, UserOut, UserUpdate
+from app.security import hash_password_async, hash_passwords_parallel
+
+settings = get_settings()
 
 router = APIRouter(prefix='/api/users', tags=['users'])
 
+USER_ROLES = {'member', 'driver', 'host', 'admin'}
+
 
 @router.get('', response_model=UserList)
-async def list_users(
+def list_users(
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    q: Optional[str] = Query(None, min_length=1, max_length=255),
     admin_user: User = Depends(require_role('admin')),
     db: Session = Depends(get_db)
 ) -> UserList:
-    offset = (page - 1) * limit
-    users = db.query(User).order_by(User.created_at.desc()).offset(offset).limit(limit).all()
-    total = db.query(User).count()
+    query = db.query(User)
+    if q:
+        query = query.filter(or_(prefix_range(User.username, q), prefix_range(User.email, q.lower())))
+
+    page_query = query.order_by(User.created_at.desc(), User.id.desc())
+    if cursor:
+        page_query = page_query.filter(before_cursor(User.created_at, User.id, cursor))
+    elif page > 1:
+        # Offset paging is kept for existing callers; follow nextCursor instead for deep pages.
+        page_query = page_query.offset((page - 1) * limit)
+    users = page_query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1].created_at, users[-1].id)
+
+    # Search results are counted directly: the prefix range keeps that to an index scan.
+    total = query.count() if q else user_total.get(query.count)
 
     return UserList(
         data=[UserOut.model_validate(user) for user in users],
         page=page,
         limit=limit,
-        total=total
+        total=total,
+        next_cursor=next_cursor
+    )
+
+
+def _email_or_username_taken(db: Session, email: str, username: str) -> bool:
+    return db.query(User.id).filter((User.email == email) | (User.username == username)).first() is not None
+
+
+def _insert_user(db: Session, payload: UserCreate, role: str, password_hash: str) -> UserOut:
+    user = User(
+        username=payload.username.strip(),
+        email=payload.email.lower(),
+        password_hash=password_hash,
+        phone_number=payload.phone_number.strip(),
+        role=role,
+        permissions=payload.permissions
     )
+    db.add(user)
+    db.commit()
+    user_total.invalidate()
+    db.refresh(user)
+
+    return UserOut.model_validate(user)
 
 
 @router.post('', response_model=UserOut, status_code=status.HTTP_201_CREATED)
@@ -35,38 +91,169 @@ async def create_user(
     db: Session = Depends(get_db)
 ) -> UserOut:
     role = payload.role or 'member'
-    if role not in {'member', 'driver', 'host', 'admin'}:
+    if role not in USER_ROLES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail={'code': 'VALIDATION_ERROR', 'message': 'Invalid role.'}
         )
 
-    existing = db.query(User).filter(
-        (User.email == payload.email.lower()) | (User.username == payload.username)
-    ).first()
-    if existing:
+    if await run_in_threadpool(_email_or_username_taken, db, payload.email.lower(), payload.username):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail={'code': 'CONFLICT', 'message': 'Username or email already exists.'}
         )
 
-    user = User(
-        username=payload.username.strip(),
-        email=payload.email.lower(),
-        password_hash=hash_password(payload.password),
-        phone_number=payload.phone_number.strip(),
-        role=role,
-        permissions=payload.permissions
+    # Hand the pooled connection back while bcrypt runs off the event loop.
+    db.close()
+    password_hash = await hash_password_async(payload.password)
+    return await run_in_threadpool(_insert_user, db, payload, role, password_hash)
+
+
+def _find_taken_names(db: Session, emails: set[str], usernames: set[str]) -> tuple[set[str], set[str]]:
+    taken_emails: set[str] = set()
+    taken_usernames: set[str] = set()
+    if emails or usernames:
+        for email, username in db.query(User.email, User.username).filter(
+            or_(User.email.in_(emails), User.username.in_(usernames))
+        ):
+            taken_emails.add(email)
+            taken_usernames.add(username)
+    return taken_emails, taken_usernames
+
+
+def _insert_import_chunks(
+    db: Session,
+    accepted: list[tuple[int, UserCreate]],
+    password_hashes: list[str]
+) -> list[UserImportRow]:
+    results: list[UserImportRow] = []
+    now = datetime.utcnow()
+    chunk_size = settings.user_import_chunk_size
+    for start in range(0, len(accepted), chunk_size):
+        chunk = accepted[start:start + chunk_size]
+        rows = [
+            {
+                'id': str(uuid.uuid4()),
+                'username': payload.username.strip(),
+                'email': payload.email.lower(),
+                'password_hash': password_hash,
+                'phone_number': payload.phone_number.strip(),
+                'role': payload.role or 'member',
+                'permissions': payload.permissions,
+                'created_at': now,
+                'updated_at': now
+            }
+            for (_, payload), password_hash in zip(chunk, password_hashes[start:start + chunk_size])
+        ]
+        try:
+            db.execute(insert(User), rows)
+            db.commit()
+        except IntegrityError:
+            # Another writer took one of these names after the duplicate check.
+            db.rollback()
+            results.extend(
+                UserImportRow(
+                    row=row,
+                    status='failed',
+                    email=values['email'],
+                    message='Conflicted with a concurrent change; retry this row.'
+                )
+                for (row, _), values in zip(chunk, rows)
+            )
+            continue
+        results.extend(
+            UserImportRow(row=row, status='created', id=values['id'], email=values['email'])
+            for (row, _), values in zip(chunk, rows)
+        )
+    return results
+
+
+def _parse_import_rows(
+    lines: Iterable[str],
+    import_format: str
+) -> tuple[list[UserImportRow], list[tuple[int, UserCreate]]]:
+    results: list[UserImportRow] = []
+    candidates: list[tuple[int, UserCreate]] = []
+    for row, record, error in iter_import_records(lines, import_format):
+        if row > settings.user_import_max_rows:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail={
+                    'code': 'TOO_MANY_ROWS',
+                    'message': f'Import at most {settings.user_import_max_rows} rows per request.'
+                }
+            )
+        if error:
+            results.append(UserImportRow(row=row, status='invalid', message=error))
+            continue
+        if isinstance(record.get('permissions'), str):
+            record['permissions'] = [item.strip() for item in record['permissions'].split(';') if item.strip()]
+        try:
+            payload = UserCreate.model_validate(record)
+        except ValidationError as exc:
+            results.append(UserImportRow(row=row, status='invalid', message=format_validation_error(exc.errors())))
+            continue
+        if (payload.role or 'member') not in USER_ROLES:
+            results.append(UserImportRow(row=row, status='invalid', email=payload.email, message='Invalid role.'))
+            continue
+        candidates.append((row, payload))
+    return results, candidates
+
+
+@router.post('/import', response_model=UserImportResponse)
+async def import_users(
+    request: Request,
+    format: Optional[str] = Query(None, pattern='^(csv|ndjson)$'),
+    admin_user: User = Depends(require_role('admin')),
+    db: Session = Depends(get_db)
+) -> UserImportResponse:
+    """Create users from a CSV (with header) or NDJSON body, one user per row."""
+    import_format = detect_import_format(request.headers.get('content-type'), format)
+    # Release the connection the auth dependency used while the body streams in.
+    db.close()
+    lines = await spool_request_body(request, settings.import_spool_max_bytes, settings.import_max_bytes)
+    try:
+        results, candidates = await run_in_threadpool(_parse_import_rows, lines, import_format)
+    finally:
+        lines.close()
+
+    # One set-based lookup covers every row; names seen earlier in the file count as taken too.
+    taken_emails, taken_usernames = await run_in_threadpool(
+        _find_taken_names,
+        db,
+        {payload.email.lower() for _, payload in candidates},
+        {payload.username.strip() for _, payload in candidates}
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
 
-    return UserOut.model_validate(user)
+    accepted: list[tuple[int, UserCreate]] = []
+    for row, payload in candidates:
+        email = payload.email.lower()
+        username = payload.username.strip()
+        if email in taken_emails or username in taken_usernames:
+            results.append(UserImportRow(
+                row=row,
+                status='duplicate',
+                email=email,
+                message='Username or email already exists.'
+            ))
+            continue
+        taken_emails.add(email)
+        taken_usernames.add(username)
+        accepted.append((row, payload))
+
+    db.close()
+    password_hashes = await hash_passwords_parallel([payload.password for _, payload in accepted])
+    results.extend(await run_in_threadpool(_insert_import_chunks, db, accepted, password_hashes))
+
+    created = sum(1 for result in results if result.status == 'created')
+    if created:
+        user_total.invalidate()
+    results.sort(key=lambda result: result.row)
+    return UserImportResponse(created=created, skipped=len(results) - created, results=results)
 
 
 @router.get('/{user_id}', response_model=UserOut)
-async def get_user(
+def get_user(
     user_id: str,
     current_user: User = Depends(require_self_or_admin),
     db: Session = Depends(get_db)
@@ -81,27 +268,7 @@ async def get_user(
     return UserOut.model_validate(user)
 
 
-@router.patch('/{user_id}', response_model=UserOut)
-async def update_user(
-    user_id: str,
-    payload: UserUpdate,
-    current_user: User = Depends(require_self_or_admin),
-    db: Session = Depends(get_db)
-) -> UserOut:
-    if payload.role or payload.permissions:
-        if current_user.role != 'admin':
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail={'code': 'FORBIDDEN', 'message': 'Only admins can update roles or permissions.'}
-            )
-
-    updates = payload.model_dump(exclude_unset=True)
-    if not updates:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={'code': 'VALIDATION_ERROR', 'message': 'At least one field is required.'}
-        )
-
+def _apply_user_update(db: Session, user_id: str, updates: dict, password_hash: str | None) -> UserOut:
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
@@ -128,13 +295,13 @@ async def update_user(
         user.email = updates['email'].lower()
 
     if 'password' in updates:
-        user.password_hash = hash_password(updates['password'])
+        user.password_hash = password_hash
 
     if 'phone_number' in updates:
         user.phone_number = updates['phone_number'].strip() if updates['phone_number'] else None
 
     if 'role' in updates:
-        if updates['role'] not in {'member', 'driver', 'host', 'admin'}:
+        if updates['role'] not in USER_ROLES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail={'code': 'VALIDATION_ERROR', 'message': 'Invalid role.'}
@@ -145,13 +312,43 @@ async def update_user(
         user.permissions = updates['permissions']
 
     db.commit()
+    principal_cache.invalidate_user(user.id)
     db.refresh(user)
 
     return UserOut.model_validate(user)
 
 
+@router.patch('/{user_id}', response_model=UserOut)
+async def update_user(
+    user_id: str,
+    payload: UserUpdate,
+    current_user: User = Depends(require_self_or_admin),
+    db: Session = Depends(get_db)
+) -> UserOut:
+    if payload.role or payload.permissions:
+        if current_user.role != 'admin':
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail={'code': 'FORBIDDEN', 'message': 'Only admins can update roles or permissions.'}
+            )
+
+    updates = payload.model_dump(exclude_unset=True)
+    if not updates:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={'code': 'VALIDATION_ERROR', 'message': 'At least one field is required.'}
+        )
+
+    password_hash = None
+    if 'password' in updates:
+        db.close()
+        password_hash = await hash_password_async(updates['password'])
+
+    return await run_in_threadpool(_apply_user_update, db, user_id, updates, password_hash)
+
+
 @router.delete('/{user_id}', response_model=UserOut)
-async def delete_user(
+def delete_user(
     user_id: str,
     admin_user: User = Depends(require_role('admin')),
     db: Session = Depends(get_db)
@@ -165,5 +362,7 @@ async def delete_user(
 
     db.delete(user)
     db.commit()
+    principal_cache.invalidate_user(user_id)
+    user_total.invalidate()
 
     return UserOut.model_validate(user)
@@ -1,20 +1,30 @@
-import google.generativeai as genai
-import os
 import json
 import io
 import logging
-from PIL import Image, ImageOps
-from dotenv import load_dotenv
+from app.core.config import get_settings
+from app.core.metrics import timed_external
+from app.core.providers import Provider
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-load_dotenv()
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-model = genai.GenerativeModel('gemini-2.5-flash')
+settings = get_settings()
+
+
+def _create_gemini_model():
+    # The Gemini SDK is the slowest import in the app; load it on the first analysis.
+    import google.generativeai as genai
+
+    genai.configure(api_key=settings.google_api_key)
+    return genai.GenerativeModel('gemini-2.5-flash')
+
+
+gemini_model = Provider(_create_gemini_model)
 
 def optimize_image_for_gemini(image_bytes: bytes, target_size=(1024, 1024), quality=85) -> bytes:
     """Optimizes image to reduce token usage and latency."""
+    from PIL import Image, ImageOps
+
     try:
         with Image.open(io.BytesIO(image_bytes)) as img:
             img = ImageOps.exif_transpose(img)
@@ -28,6 +38,7 @@ def optimize_image_for_gemini(image_bytes: bytes, target_size=(1024, 1024), qual
         logger.warning(f"Image Optimization Failed: {e}")
         return image_bytes
 
+@timed_external('gemini', 'analyze_images')
 async def analyze_multiple_images(image_byte_list: list[bytes]):
     """
     Analyzes MULTIPLE images in a SINGLE request so Gemini can 'synthesize' them.
@@ -89,7 +100,7 @@ async def analyze_multiple_images(image_byte_list: list[bytes]):
 
     try:
         # 2. Call Gemini with the LIST of contents
-        response = model.generate_content(content_payload)
+        response = gemini_model.get().generate_content(content_payload)
         if hasattr(response, 'usage_metadata'):
             usage = response.usage_metadata
             
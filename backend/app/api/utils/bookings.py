@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+from typing import Callable
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+from app.api.utils.pagination import before_cursor, encode_cursor
+from app.core.config import get_settings
+from app.db.models.booking import Booking, BookingArchive
+
+settings = get_settings()
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+DEFAULT_PAGE_SIZE = 50
+# Archived rows an unpaged read returns before it hands back a cursor instead.
+UNPAGED_ARCHIVE_LIMIT = 100
+
+
+def _booking(row):
+    return row if isinstance(row, (Booking, BookingArchive)) else row[0]
+
+
+def _sort_key(row) -> tuple[datetime, str]:
+    booking = _booking(row)
+    return booking.created_at, booking.id
+
+
+def _page(query: Query, model, limit: int, cursor: str | None) -> list:
+    if cursor:
+        query = query.filter(before_cursor(model.created_at, model.id, cursor))
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+
+
+def archive_horizon(now: datetime | None = None) -> datetime | None:
+    """Nothing created after this is ever archived; None when archival is off."""
+    if settings.booking_archive_after_days <= 0:
+        return None
+    return (now or datetime.utcnow()) - timedelta(days=settings.booking_archive_after_days)
+
+
+def _merge(*row_lists: list) -> list:
+    # A row archived between two reads can show up in both; keep one.
+    merged = {}
+    for rows in reversed(row_lists):
+        merged.update((_booking(row).id, row) for row in rows)
+    return sorted(merged.values(), key=_sort_key, reverse=True)
+
+
+def _unpaged(query_for: Callable[[type], Query]) -> tuple[list, str | None]:
+    archived = _page(query_for(BookingArchive), BookingArchive, UNPAGED_ARCHIVE_LIMIT, None)
+    rows = _merge(query_for(Booking).all(), archived[:UNPAGED_ARCHIVE_LIMIT])
+    if len(archived) <= UNPAGED_ARCHIVE_LIMIT:
+        return rows, None
+    # Cut at the oldest archived row returned so the rows form an exact prefix
+    # of the (created_at, id) order; older hot rows follow on the next page.
+    oldest = _sort_key(archived[UNPAGED_ARCHIVE_LIMIT - 1])
+    return [row for row in rows if _sort_key(row) >= oldest], encode_cursor(*oldest)
+
+
+def booking_page(
+    query_for: Callable[[type], Query],
+    limit: int | None,
+    cursor: str | None
+) -> tuple[list, str | None]:
+    """One newest-first page of bookings and the cursor for the next one.
+
+    ``query_for(model)`` returns the filtered query for ``Booking`` or
+    ``BookingArchive`` with the booking as its first (or only) entity. Both
+    tables share the (created_at, id) order, so one cursor walks across them.
+    The archive is only read when the page runs out of hot rows or reaches
+    ages the archival job may have moved. Paging is opt-in: with neither
+    ``limit`` nor ``cursor`` every hot booking is returned along with the
+    newest ``UNPAGED_ARCHIVE_LIMIT`` archived ones. When more are archived,
+    the list stops at the oldest archived row returned and the cursor resumes
+    from there.
+    """
+    if limit is None and cursor is None:
+        return _unpaged(query_for)
+    limit = limit or DEFAULT_PAGE_SIZE
+
+    rows = _page(query_for(Booking), Booking, limit, cursor)
+    horizon = archive_horizon()
+    if horizon is None or len(rows) <= limit or _booking(rows[limit - 1]).created_at <= horizon:
+        archived = _page(query_for(BookingArchive), BookingArchive, limit, cursor)
+        if archived:
+            rows = _merge(rows, archived)[:limit + 1]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(*_sort_key(rows[-1]))
+    return rows, next_cursor
+
+
+def completed_rating_totals(db: Session, station_id: str) -> tuple[int, int]:
+    """Count and sum of ratings on a station's COMPLETED bookings, archived ones included."""
+    count, total = 0, 0
+    for model in (Booking, BookingArchive):
+        model_count, model_total = db.query(func.count(model.id), func.coalesce(func.sum(model.rating), 0)).filter(
+            model.station_id == station_id,
+            model.status == 'COMPLETED',
+            model.rating.isnot(None)
+        ).one()
+        count += model_count
+        total += model_total
+    return count, total
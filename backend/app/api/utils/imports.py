@@ -0,0 +1,120 @@
+import codecs
+import csv
+import io
+import json
+from tempfile import SpooledTemporaryFile
+from typing import Iterable, Iterator
+from fastapi import HTTPException, Request
+from starlette import status
+
+CSV_CONTENT_TYPES = {'text/csv', 'application/csv'}
+NDJSON_CONTENT_TYPES = {'application/x-ndjson', 'application/ndjson', 'application/jsonl'}
+
+
+def detect_import_format(content_type: str | None, requested: str | None = None) -> str:
+    if requested:
+        return requested
+    media_type = (content_type or '').split(';', 1)[0].strip().lower()
+    if media_type in CSV_CONTENT_TYPES:
+        return 'csv'
+    if media_type in NDJSON_CONTENT_TYPES:
+        return 'ndjson'
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail={
+            'code': 'UNSUPPORTED_MEDIA_TYPE',
+            'message': 'Send text/csv or application/x-ndjson, or pass format=csv|ndjson.'
+        }
+    )
+
+
+def iter_import_records(lines: Iterable[str], import_format: str) -> Iterator[tuple[int, dict | None, str | None]]:
+    """Yield ``(row_number, record, error)`` for each data row; exactly one of record/error is set.
+
+    CSV rows use the header line as keys and drop empty cells so optional
+    fields fall back to their defaults. Row numbers count data rows from 1.
+    """
+    if import_format == 'csv':
+        row_number = 0
+        reader = csv.DictReader(lines)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as exc:
+                # The reader cannot resynchronise reliably, so report the row and stop.
+                yield row_number + 1, None, f'Unreadable CSV: {exc}'
+                return
+            row_number += 1
+            if None in row:
+                yield row_number, None, 'Row has more columns than the header.'
+                continue
+            yield row_number, {key.strip(): value for key, value in row.items() if key and value not in (None, '')}, None
+
+    row_number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield row_number, None, 'Line is not valid JSON.'
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, 'Line must be a JSON object.'
+            continue
+        yield row_number, record, None
+
+
+def format_validation_error(errors: list[dict]) -> str:
+    first = errors[0]
+    field = '.'.join(str(part) for part in first.get('loc', ()))
+    return f"{field}: {first.get('msg')}" if field else str(first.get('msg'))
+
+
+def _body_too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail={'code': 'PAYLOAD_TOO_LARGE', 'message': f'Import bodies are limited to {max_bytes} bytes.'}
+    )
+
+
+async def spool_request_body(request: Request, max_memory_bytes: int, max_bytes: int) -> io.TextIOWrapper:
+    """Copy the request body into a temporary file, read back as text lines.
+
+    The body stays in memory up to ``max_memory_bytes`` and spills to disk
+    beyond that, so large imports never sit in memory whole. Bodies over
+    ``max_bytes`` are rejected with 413 as soon as they cross the limit, and
+    the bytes are checked as UTF-8 on the way in so a bad upload is a 400
+    rather than a failure part-way through the import. The caller closes the
+    returned file.
+    """
+    content_length = request.headers.get('content-length')
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise _body_too_large(max_bytes)
+
+    spool = SpooledTemporaryFile(max_size=max_memory_bytes)
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='strict')
+    size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > max_bytes:
+                raise _body_too_large(max_bytes)
+            decoder.decode(chunk)
+            spool.write(chunk)
+        decoder.decode(b'', final=True)
+        spool.seek(0)
+        # newline='' keeps quoted newlines inside CSV cells intact.
+        return io.TextIOWrapper(spool, encoding='utf-8-sig', errors='strict', newline='')
+    except UnicodeDecodeError:
+        spool.close()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={'code': 'INVALID_ENCODING', 'message': 'Import bodies must be UTF-8 encoded.'}
+        )
+    except BaseException:
+        spool.close()
+        raise
@@ -0,0 +1,62 @@
+import base64
+import time
+from datetime import datetime
+from threading import Lock
+from typing import Callable
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from starlette import status
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    raw = f'{created_at.isoformat()}|{row_id}'.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        created_at, row_id = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), row_id
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={'code': 'VALIDATION_ERROR', 'message': 'Invalid cursor.'}
+        )
+
+
+def before_cursor(created_column, id_column, cursor: str):
+    """Rows after ``cursor`` when ordering by (created_at, id) descending."""
+    created_at, row_id = decode_cursor(cursor)
+    return or_(created_column < created_at, and_(created_column == created_at, id_column < row_id))
+
+
+def prefix_range(column, prefix: str):
+    # A half-open range instead of LIKE so a plain btree index on the column is used
+    # regardless of collation or LIKE case sensitivity settings.
+    return and_(column >= prefix, column < prefix + '\U0010ffff')
+
+
+class CachedCount:
+    """A row count recomputed at most once per ``ttl_seconds``."""
+
+    def __init__(self, ttl_seconds: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.value: int | None = None
+        self.expires = 0.0
+        self.lock = Lock()
+
+    def get(self, compute: Callable[[], int]) -> int:
+        now = time.monotonic()
+        with self.lock:
+            if self.value is not None and now < self.expires:
+                return self.value
+        value = compute()
+        with self.lock:
+            self.value = value
+            self.expires = now + self.ttl_seconds
+        return value
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.value = None
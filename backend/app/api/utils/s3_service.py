@@ -1,43 +1,52 @@
-import boto3
-import os
 import logging
-from botocore.exceptions import NoCredentialsError, ClientError
-from dotenv import load_dotenv
+from app.core.config import get_settings
+from app.core.metrics import timed_external
+from app.core.providers import Provider
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-load_dotenv()
+settings = get_settings()
 
-# Initialize S3 Client
-s3_client = boto3.client(
-    's3',
-    aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-    aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-    region_name=os.getenv('AWS_REGION')
-)
 
-BUCKET_NAME = os.getenv('AWS_BUCKET_NAME')
+def _create_s3_client():
+    # boto3 takes a noticeable share of startup; only import it when an upload happens.
+    import boto3
 
+    return boto3.client(
+        's3',
+        aws_access_key_id=settings.aws_access_key_id or None,
+        aws_secret_access_key=settings.aws_secret_access_key or None,
+        region_name=settings.aws_region or None
+    )
+
+
+s3_client = Provider(_create_s3_client)
+
+@timed_external('s3', 'upload')
 def upload_file_to_s3(file_obj, object_name: str) -> str | None:
     """
     Uploads a file-like object (BytesIO) to S3.
     """
-    if not BUCKET_NAME:
+    from botocore.exceptions import NoCredentialsError, ClientError
+
+    bucket_name = settings.aws_bucket_name
+    if not bucket_name:
         logger.error("AWS_BUCKET_NAME is not set in .env")
         return None
 
     try:
+        client = s3_client.get()
         # Reset pointer to start of file stream
         file_obj.seek(0)
         
-        logger.info(f"📤 Uploading {object_name} to S3 bucket {BUCKET_NAME}...")
+        logger.info(f"📤 Uploading {object_name} to S3 bucket {bucket_name}...")
         
         # Upload
-        s3_client.upload_fileobj(
+        client.upload_fileobj(
             file_obj,
-            BUCKET_NAME,
+            bucket_name,
             object_name,
             ExtraArgs={
                 'ContentType': 'image/jpeg', 
@@ -47,14 +56,14 @@ def upload_file_to_s3(file_obj, object_name: str) -> str | None:
         )
         
         # Construct Public URL
-        region = os.getenv('AWS_REGION')
-        url = f"https://{BUCKET_NAME}.s3.{region}.amazonaws.com/{object_name}"
+        region = settings.aws_region
+        url = f"https://{bucket_name}.s3.{region}.amazonaws.com/{object_name}"
         
         logger.info(f"✅ S3 Upload Success: {url}")
         
         # Verify the file exists by checking if we can get its metadata
         try:
-            s3_client.head_object(Bucket=BUCKET_NAME, Key=object_name)
+            client.head_object(Bucket=bucket_name, Key=object_name)
             logger.info(f"✅ Verified file exists in S3: {object_name}")
         except Exception as e:
             logger.warning(f"⚠️ Could not verify file in S3: {e}")
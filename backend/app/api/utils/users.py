@@ -1,16 +1,40 @@
+from datetime import datetime
 from sqlalchemy.orm import Session
-from app.db.models.driver_profile import DriverProfile
-from app.db.models.host_profile import HostProfile
+from app.api.utils.pagination import CachedCount
+from app.core.config import get_settings
+from app.db.models.session import Session as DbSession
 from app.db.models.user import User
 from app.models.user import UserOut
+from app.security import create_access_token
 
+settings = get_settings()
 
-def build_user_out(db: Session, user: User) -> UserOut:
-    user_out = UserOut.model_validate(user)
-    user_out.driver_profile_complete = db.query(DriverProfile).filter(
-        DriverProfile.user_id == user.id
-    ).first() is not None
-    user_out.host_profile_complete = db.query(HostProfile).filter(
-        HostProfile.user_id == user.id
-    ).first() is not None
-    return user_out
+# Total for the admin user list; create/delete invalidate it, other writers refresh within the TTL.
+user_total = CachedCount(settings.user_count_cache_seconds)
+
+
+def build_user_out(user: User) -> UserOut:
+    # Profile completeness lives on the user row, so this never touches the database.
+    return UserOut.model_validate(user)
+
+
+def revoke_user_sessions(db: Session, user_id: str) -> list[str]:
+    """Mark the user's active sessions revoked and return their ids.
+
+    The caller commits, then passes the ids to ``revocation_list.revoke`` so a
+    rolled-back change never lands in the in-memory list.
+    """
+    now = datetime.utcnow()
+    active = db.query(DbSession).filter(DbSession.user_id == user_id, DbSession.revoked_at.is_(None))
+    session_ids = [session_id for (session_id,) in active.with_entities(DbSession.id)]
+    active.update({DbSession.revoked_at: now}, synchronize_session=False)
+    return session_ids
+
+
+def issue_access_token(user: User, session_id: str) -> str:
+    return create_access_token({
+        'sub': user.id,
+        'sid': session_id,
+        'role': user.role,
+        'permissions': user.permissions
+    })
@@ -0,0 +1,90 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Any
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class CachedPrincipal:
+    user_id: str
+    session_expires_at: datetime
+    user: dict[str, Any]
+
+
+class PrincipalCache:
+    """TTL-bounded LRU of validated sessions, keyed by session id.
+
+    Entries are process-local: writes that change a user or revoke a session
+    must call ``invalidate_session``/``invalidate_user`` so this worker stops
+    serving the stale snapshot, and the TTL bounds staleness on other workers.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict[str, tuple[float, CachedPrincipal]] = OrderedDict()
+        self.sessions_by_user: dict[str, set[str]] = {}
+        self.lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, session_id: str) -> CachedPrincipal | None:
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self.lock:
+            item = self.entries.get(session_id)
+            if item is None:
+                return None
+            expires, principal = item
+            if expires <= now:
+                self._drop_session(session_id)
+                return None
+            self.entries.move_to_end(session_id)
+            return principal
+
+    def put(self, session_id: str, principal: CachedPrincipal) -> None:
+        if not self.enabled:
+            return
+        with self.lock:
+            self._drop_session(session_id)
+            self.entries[session_id] = (time.monotonic() + self.ttl_seconds, principal)
+            self.sessions_by_user.setdefault(principal.user_id, set()).add(session_id)
+            while len(self.entries) > self.max_entries:
+                oldest = next(iter(self.entries))
+                self._drop_session(oldest)
+
+    def invalidate_session(self, session_id: str) -> None:
+        with self.lock:
+            self._drop_session(session_id)
+
+    def invalidate_user(self, user_id: str) -> None:
+        with self.lock:
+            for session_id in list(self.sessions_by_user.get(user_id, ())):
+                self._drop_session(session_id)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.sessions_by_user.clear()
+
+    def _drop_session(self, session_id: str) -> None:
+        item = self.entries.pop(session_id, None)
+        if item is None:
+            return
+        user_id = item[1].user_id
+        sessions = self.sessions_by_user.get(user_id)
+        if sessions is not None:
+            sessions.discard(session_id)
+            if not sessions:
+                del self.sessions_by_user[user_id]
+
+
+principal_cache = PrincipalCache(settings.auth_cache_max_entries, settings.auth_cache_ttl_seconds)
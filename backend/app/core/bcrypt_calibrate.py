@@ -0,0 +1,101 @@
+"""
+Measure bcrypt cost on this host and recommend BCRYPT_ROUNDS for a target latency.
+
+    python -m app.core.bcrypt_calibrate --target-ms 100
+    python -m app.core.bcrypt_calibrate --target-ms 100 --write-env .env
+
+The recommendation is the highest cost whose median hash time stays within
+the target, never below ``--min-rounds`` (10 by default). When even that
+cost is slower than the target the tool says so and exits non-zero without
+touching ``--write-env``. Existing hashes are upgraded (or downgraded) to the new cost the
+next time each user logs in, so changing it needs no password reset.
+"""
+import argparse
+import re
+import statistics
+import sys
+import time
+import bcrypt
+
+BCRYPT_MIN_ROUNDS = 4
+# Lowest cost the tool will recommend; cheaper hashes are too easy to brute force.
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+
+def measure_rounds(rounds: int, samples: int) -> float:
+    """Median wall time in milliseconds to hash one password at ``rounds``."""
+    timings = []
+    for _ in range(samples):
+        salt = bcrypt.gensalt(rounds=rounds)
+        started = time.perf_counter()
+        bcrypt.hashpw(b'calibration-password', salt)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(target_ms: float, samples: int = 3, min_rounds: int = MIN_ROUNDS) -> tuple[int, dict[int, float]]:
+    """Recommended rounds and the median time per cost tried.
+
+    Returns ``min_rounds`` even when it misses the target; check
+    ``timings[recommended] > target_ms`` for that case.
+    """
+    if not BCRYPT_MIN_ROUNDS <= min_rounds <= MAX_ROUNDS:
+        raise ValueError(f'min_rounds must be between {BCRYPT_MIN_ROUNDS} and {MAX_ROUNDS}.')
+    timings: dict[int, float] = {}
+    recommended = min_rounds
+    for rounds in range(min_rounds, MAX_ROUNDS + 1):
+        timings[rounds] = measure_rounds(rounds, samples)
+        if timings[rounds] > target_ms:
+            break
+        recommended = rounds
+    return recommended, timings
+
+
+def write_env(path: str, rounds: int) -> None:
+    try:
+        with open(path, encoding='utf-8') as handle:
+            content = handle.read()
+    except FileNotFoundError:
+        content = ''
+
+    line = f'BCRYPT_ROUNDS={rounds}'
+    if re.search(r'^BCRYPT_ROUNDS=.*$', content, flags=re.MULTILINE):
+        content = re.sub(r'^BCRYPT_ROUNDS=.*$', line, content, flags=re.MULTILINE)
+    else:
+        content = f'{content.rstrip()}\n{line}\n' if content.strip() else f'{line}\n'
+
+    with open(path, 'w', encoding='utf-8') as handle:
+        handle.write(content)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target-ms', type=float, default=100.0)
+    parser.add_argument('--samples', type=int, default=3)
+    parser.add_argument('--min-rounds', type=int, default=MIN_ROUNDS)
+    parser.add_argument('--write-env', metavar='PATH', help='Set BCRYPT_ROUNDS in this env file.')
+    args = parser.parse_args()
+
+    try:
+        recommended, timings = calibrate(args.target_ms, args.samples, args.min_rounds)
+    except ValueError as exc:
+        parser.error(str(exc))
+    for rounds, elapsed in timings.items():
+        print(f'rounds={rounds:<3} {elapsed:9.1f} ms')
+    if timings[recommended] > args.target_ms:
+        print(
+            f'Even BCRYPT_ROUNDS={recommended} takes {timings[recommended]:.1f} ms, over the '
+            f'{args.target_ms:g} ms target; raise --target-ms or lower --min-rounds.',
+            file=sys.stderr
+        )
+        sys.exit(1)
+    print(f'Recommended BCRYPT_ROUNDS={recommended} for a {args.target_ms:g} ms target')
+
+    if args.write_env:
+        write_env(args.write_env, recommended)
+        print(f'Wrote BCRYPT_ROUNDS={recommended} to {args.write_env}')
+
+
+if __name__ == '__main__':
+    main()
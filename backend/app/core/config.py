@@ -13,11 +13,56 @@ class Settings(BaseSettings):
     port: int = 8000
     database_url: str = Field(default='sqlite:///./snapcharge.db')
 
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: int = 30
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    # With this off, run `python -m app.db.migrations` before deploying; workers refuse to start behind it.
+    db_migrate_on_startup: bool = True
+    # Optional replica for read-only routes; reads stick to the primary this long after a user writes.
+    database_read_url: str = Field(default='')
+    read_your_writes_seconds: int = 5
+    # Worker threads for sync routes and dependencies; 0 keeps anyio's default (40).
+    # Keep it well above DB_POOL_SIZE + DB_MAX_OVERFLOW.
+    threadpool_tokens: int = 0
+    # Applied to every new SQLite connection (file databases only).
+    sqlite_pragmas: bool = True
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size_bytes: int = 268435456
+    sqlite_cache_size_kib: int = 65536
+    # Per-request query accounting: debug headers, and warnings past these limits (0 disables).
+    query_stats_headers: bool = False
+    query_budget_per_request: int = 20
+    query_repeat_warning: int = 5
+    # Statements slower than this are logged and explained once each; 0 disables.
+    slow_query_ms: int = 200
+    slow_query_max_statements: int = 200
+    # Workers share /metrics through snapshot files here; empty keeps metrics per process.
+    metrics_multiproc_dir: str = Field(default='')
+    metrics_flush_seconds: int = 5
+
     jwt_secret_key: str = Field(min_length=32)
     jwt_refresh_secret_key: str = Field(min_length=32)
     access_token_expire_minutes: int = 1440  # 24 hours (1 day)
     refresh_token_expire_days: int = 30
     bcrypt_rounds: int = 12
+    password_hash_workers: int = 0  # 0 = one per CPU core
+    password_hash_queue_max: int = 64
+    password_import_workers: int = 0  # bulk-import hashing processes; 0 = one per CPU core
+    user_import_max_rows: int = 5000
+    user_import_chunk_size: int = 500
+    station_import_max_rows: int = 5000
+    station_import_chunk_size: int = 500
+    # Import bodies larger than this spill from memory to a temporary file.
+    import_spool_max_bytes: int = 1024 * 1024
+    import_max_bytes: int = 50 * 1024 * 1024
+    auth_cache_ttl_seconds: int = 30
+    auth_cache_max_entries: int = 10000
+    # Trust signature + expiry and check an in-memory revocation list instead of the sessions table.
+    auth_stateless: bool = False
+    auth_revocation_sync_seconds: int = 5
+    user_count_cache_seconds: int = 60
 
     app_base_url: str = 'http://localhost:8000'
     cors_origins: str = 'http://localhost:5173'
@@ -26,9 +71,32 @@ class Settings(BaseSettings):
     rate_limit_login_max: int = 8
     rate_limit_register_max: int = 5
     rate_limit_reset_max: int = 5
+    # 'memory' is per process; 'sqlite' shares counters between workers on one host.
+    rate_limit_backend: str = 'memory'
+    rate_limit_sqlite_path: str = './rate_limits.db'
 
     seed_demo_data: bool = False
 
+    # Transactional email: 'memory' keeps the last EMAIL_LOG_MAX_ENTRIES messages, 'smtp' delivers them.
+    email_transport: str = 'memory'
+    email_from: str = 'SnapCharge <no-reply@snapcharge.dev>'
+    email_log_max_entries: int = 1000
+    email_outbox_batch_size: int = 100
+    email_outbox_poll_seconds: int = 10
+    email_max_attempts: int = 5
+    smtp_host: str = Field(default='')
+    smtp_port: int = 587
+    smtp_username: str = Field(default='')
+    smtp_password: str = Field(default='')
+    smtp_use_tls: bool = True
+
+    # Purge expired/revoked sessions and one-time tokens; 0 disables the background task.
+    maintenance_interval_seconds: int = 3600
+    maintenance_batch_size: int = 1000
+    # COMPLETED/CANCELLED bookings created this long ago move to bookings_archive; 0 keeps them.
+    # History reads assume nothing newer than this was archived, so only lower it, never raise it.
+    booking_archive_after_days: int = 180
+
     # Google API
     google_api_key: str = Field(default='')
 
@@ -24,11 +24,13 @@ def _sanitize_error_details(details):
 
 def http_exception_handler(request: Request, exc: StarletteHTTPException) -> JSONResponse:
     detail = exc.detail
+    headers = getattr(exc, 'headers', None)
     if isinstance(detail, dict) and 'code' in detail and 'message' in detail:
-        return JSONResponse(status_code=exc.status_code, content={'error': detail})
+        return JSONResponse(status_code=exc.status_code, content={'error': detail}, headers=headers)
     return JSONResponse(
         status_code=exc.status_code,
-        content=format_error('HTTP_ERROR', str(detail))
+        content=format_error('HTTP_ERROR', str(detail)),
+        headers=headers
     )
 
 
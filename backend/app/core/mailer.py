@@ -1,40 +1,290 @@
-from datetime import datetime
+import asyncio
+import logging
+import smtplib
+from collections import deque
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from threading import Lock
 from uuid import uuid4
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import get_settings
+from app.db.models.email_outbox import EmailOutbox
+from app.db.session import SessionLocal
 
-_email_log: list[dict] = []
+settings = get_settings()
+logger = logging.getLogger(__name__)
 
+# A claimed message is not due again until this passes, so a worker that dies
+# mid-send only delays that one message.
+SEND_LEASE = timedelta(minutes=5)
+# These carry a raw one-time token in meta['link']. The link is only kept while
+# the message may still be sent: sent rows are deleted and failed rows keep
+# just the token hash.
+ONE_TIME_LINK_TYPES = ('verification', 'password_reset')
 
-def send_email(payload: dict) -> dict:
-    record = {
-        'id': str(uuid4()),
-        'sent_at': datetime.utcnow().isoformat(),
-        **payload
-    }
-    _email_log.append(record)
-    return record
 
+class MemoryTransport:
+    """Keeps the most recent messages in a ring buffer instead of delivering them."""
 
-def send_verification_email(to: str, username: str, link: str) -> dict:
-    return send_email({
+    def __init__(self, max_entries: int) -> None:
+        self.log: deque[dict] = deque(maxlen=max_entries)
+        self.lock = Lock()
+
+    def send(self, payload: dict) -> dict:
+        record = {
+            'id': str(uuid4()),
+            'sent_at': datetime.utcnow().isoformat(),
+            **payload
+        }
+        with self.lock:
+            self.log.append(record)
+        return record
+
+    def close(self) -> None:
+        pass
+
+
+class SmtpTransport:
+    """Delivers over one SMTP connection that is reused across messages and batches."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        use_tls: bool,
+        sender: str
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.sender = sender
+        self.connection: smtplib.SMTP | None = None
+        self.lock = Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=30)
+        if self.use_tls:
+            connection.starttls()
+        if self.username:
+            connection.login(self.username, self.password)
+        return connection
+
+    def send(self, payload: dict) -> dict:
+        message = EmailMessage()
+        message['From'] = self.sender
+        message['To'] = payload['to']
+        message['Subject'] = payload['subject']
+        message.set_content(render_email_body(payload))
+
+        with self.lock:
+            if self.connection is None:
+                self.connection = self._connect()
+            try:
+                self.connection.send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                # The server dropped an idle connection; reconnect once and retry.
+                self.connection = self._connect()
+                self.connection.send_message(message)
+        return payload
+
+    def close(self) -> None:
+        with self.lock:
+            if self.connection is not None:
+                try:
+                    self.connection.quit()
+                except smtplib.SMTPException:
+                    pass
+                self.connection = None
+
+
+def render_email_body(payload: dict) -> str:
+    meta = payload.get('meta') or {}
+    if payload['type'] == 'verification':
+        return f"Hi {meta.get('username', '')},\n\nVerify your SnapCharge account: {meta['link']}\n"
+    if payload['type'] == 'password_reset':
+        return f"Reset your SnapCharge password: {meta['link']}\n\nIf you did not ask for this, ignore this email.\n"
+    return '\n'.join(f'{key}: {value}' for key, value in meta.items())
+
+
+def create_transport() -> MemoryTransport | SmtpTransport:
+    if settings.email_transport == 'smtp':
+        return SmtpTransport(
+            host=settings.smtp_host,
+            port=settings.smtp_port,
+            username=settings.smtp_username,
+            password=settings.smtp_password,
+            use_tls=settings.smtp_use_tls,
+            sender=settings.email_from
+        )
+    return MemoryTransport(settings.email_log_max_entries)
+
+
+transport = create_transport()
+# One drain per process at a time. A request that finds a drain running sets
+# _drain_requested so the running drain makes another pass for its message.
+_drain_lock = Lock()
+_drain_requested = False
+
+
+def queue_email(db: Session, payload: dict) -> EmailOutbox:
+    """Add an outbox row to ``db``; it is committed with the caller's transaction."""
+    message = EmailOutbox(
+        to=payload['to'],
+        subject=payload['subject'],
+        type=payload['type'],
+        meta=payload.get('meta') or {}
+    )
+    db.add(message)
+    return message
+
+
+def queue_verification_email(db: Session, to: str, username: str, link: str, token_hash: str) -> EmailOutbox:
+    return queue_email(db, {
         'to': to,
         'subject': 'Verify your SnapCharge account',
         'type': 'verification',
-        'meta': {'link': link, 'username': username}
+        'meta': {'link': link, 'username': username, 'token_hash': token_hash}
     })
 
 
-def send_password_reset_email(to: str, link: str) -> dict:
-    return send_email({
+def queue_password_reset_email(db: Session, to: str, link: str, token_hash: str) -> EmailOutbox:
+    return queue_email(db, {
         'to': to,
         'subject': 'Reset your SnapCharge password',
         'type': 'password_reset',
-        'meta': {'link': link}
+        'meta': {'link': link, 'token_hash': token_hash}
     })
 
 
+def _without_link(meta: dict) -> dict:
+    return {key: value for key, value in meta.items() if key != 'link'}
+
+
+def _claim(db: Session, message_ids: list[str], now: datetime) -> list[str]:
+    # A conditional UPDATE per row is atomic on SQLite and Postgres alike, so
+    # exactly one worker wins each message even where FOR UPDATE is ignored.
+    claimed = []
+    for message_id in message_ids:
+        result = db.execute(
+            update(EmailOutbox)
+            .where(
+                EmailOutbox.id == message_id,
+                EmailOutbox.status == 'pending',
+                EmailOutbox.next_attempt_at <= now
+            )
+            .values(attempts=EmailOutbox.attempts + 1, next_attempt_at=now + SEND_LEASE)
+        )
+        if result.rowcount:
+            claimed.append(message_id)
+    db.commit()
+    return claimed
+
+
+def _record_outcome(db: Session, message_id: str, values: dict) -> None:
+    db.execute(update(EmailOutbox).where(EmailOutbox.id == message_id).values(**values))
+    db.commit()
+
+
+def _discard(db: Session, message_id: str) -> None:
+    db.execute(delete(EmailOutbox).where(EmailOutbox.id == message_id))
+    db.commit()
+
+
+def deliver_batch(db: Session, batch_size: int) -> int:
+    """Send up to ``batch_size`` due messages and record the outcome; returns the number considered.
+
+    Messages are claimed and committed before any is sent, each send happens
+    outside a transaction, and each outcome is committed on its own, so a
+    crash part-way never resends messages that already went out.
+    """
+    now = datetime.utcnow()
+    candidates = [
+        message_id for (message_id,) in db.query(EmailOutbox.id)
+        .filter(EmailOutbox.status == 'pending', EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at)
+        .limit(batch_size)
+    ]
+    if not candidates:
+        db.rollback()
+        return 0
+    claimed = _claim(db, candidates, now)
+    messages = db.query(EmailOutbox).filter(EmailOutbox.id.in_(claimed)).all() if claimed else []
+    # Plain values up front: each per-message commit below expires the ORM rows.
+    pending = [
+        (message.id, message.attempts, {
+            'to': message.to,
+            'subject': message.subject,
+            'type': message.type,
+            'meta': message.meta
+        })
+        for message in messages
+    ]
+    db.rollback()
+
+    for message_id, attempts, payload in pending:
+        try:
+            transport.send(payload)
+        except Exception as exc:
+            values = {'last_error': str(exc)[:1000]}
+            if attempts >= settings.email_max_attempts:
+                values['status'] = 'failed'
+                values['meta'] = _without_link(payload['meta'])
+            else:
+                values['next_attempt_at'] = datetime.utcnow() + timedelta(seconds=30 * 2 ** (attempts - 1))
+            _record_outcome(db, message_id, values)
+            logger.warning('Email %s delivery attempt %s failed: %s', message_id, attempts, exc)
+            continue
+        if payload['type'] in ONE_TIME_LINK_TYPES:
+            _discard(db, message_id)
+        else:
+            _record_outcome(db, message_id, {'status': 'sent', 'sent_at': datetime.utcnow(), 'last_error': None})
+    return len(candidates)
+
+
+def drain_outbox() -> int:
+    global _drain_requested
+    _drain_requested = True
+    if not _drain_lock.acquire(blocking=False):
+        return 0
+    db = SessionLocal()
+    try:
+        handled = 0
+        while _drain_requested:
+            _drain_requested = False
+            while True:
+                count = deliver_batch(db, settings.email_outbox_batch_size)
+                handled += count
+                if count < settings.email_outbox_batch_size:
+                    break
+        return handled
+    finally:
+        db.close()
+        _drain_lock.release()
+
+
+async def run_outbox_worker(interval_seconds: int) -> None:
+    while True:
+        try:
+            await run_in_threadpool(drain_outbox)
+        except Exception:
+            logger.exception('Email outbox drain failed')
+        await asyncio.sleep(interval_seconds)
+
+
 def get_email_log() -> list[dict]:
-    return list(_email_log)
+    if isinstance(transport, MemoryTransport):
+        with transport.lock:
+            return list(transport.log)
+    return []
 
 
 def clear_email_log() -> None:
-    _email_log.clear()
+    if isinstance(transport, MemoryTransport):
+        with transport.lock:
+            transport.log.clear()
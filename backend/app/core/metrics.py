@@ -0,0 +1,338 @@
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Any, Callable, Iterable
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EXTERNAL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.values: dict[tuple[str, ...], Any] = {}
+        self.lock = Lock()
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            samples = [[list(labels), list(value) if isinstance(value, list) else value] for labels, value in self.values.items()]
+        return {'type': self.kind, 'help': self.help_text, 'labelnames': list(self.labelnames), 'samples': samples}
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, labels: tuple[str, ...] = (), amount: float = 1) -> None:
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, labels: tuple[str, ...], value: float) -> None:
+        with self.lock:
+            self.values[labels] = value
+
+    def inc(self, labels: tuple[str, ...] = (), amount: float = 1) -> None:
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, labels: tuple[str, ...] = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(Metric):
+    """Per label set: one count per bucket plus +Inf, then the running sum."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.values.get(labels)
+            if counts is None:
+                counts = self.values[labels] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def snapshot(self) -> dict:
+        snapshot = super().snapshot()
+        snapshot['buckets'] = list(self.buckets)
+        return snapshot
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _merge(snapshots: list[dict]) -> dict:
+    merged: dict[str, dict] = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, 'samples': {}})
+            for labels, value in metric['samples']:
+                key = tuple(labels)
+                current = target['samples'].get(key)
+                if current is None:
+                    target['samples'][key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    target['samples'][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target['samples'][key] = current + value
+    return merged
+
+
+def render(snapshots: list[dict]) -> str:
+    lines: list[str] = []
+    for name, metric in sorted(_merge(snapshots).items()):
+        lines.append(f'# HELP {name} {metric["help"]}')
+        lines.append(f'# TYPE {name} {metric["type"]}')
+        labelnames = metric['labelnames']
+        for labels, value in sorted(metric['samples'].items()):
+            if metric['type'] != 'histogram':
+                lines.append(f'{name}{_format_labels(labelnames, labels)} {_format_value(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip([*metric['buckets'], '+Inf'], value[:-1]):
+                cumulative += count
+                le = 'le="+Inf"' if bound == '+Inf' else f'le="{bound}"'
+                lines.append(f'{name}_bucket{_format_labels(labelnames, labels, le)} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labelnames, labels)} {_format_value(value[-1])}')
+            lines.append(f'{name}_count{_format_labels(labelnames, labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsRegistry:
+    """Process-local metrics, optionally shared through snapshot files.
+
+    Each observation updates a preallocated slot under a per-metric lock.
+    With ``METRICS_MULTIPROC_DIR`` set, every worker writes its snapshot to
+    ``<dir>/metrics-<pid>.json`` every ``METRICS_FLUSH_SECONDS`` and a scrape
+    merges all files, so any worker can answer for the whole host. Counters
+    and histograms from exited workers keep counting toward the totals;
+    their gauges are dropped. Clear the directory when redeploying.
+    """
+
+    def __init__(self, multiproc_dir: str = '') -> None:
+        self.multiproc_dir = multiproc_dir
+        self.metrics: dict[str, Metric] = {}
+        self.collectors: list[Callable[[], None]] = []
+
+    def _register(self, metric: Metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Run ``collector`` before each snapshot to refresh scrape-time gauges."""
+        self.collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception:
+                logger.exception('Metrics collector failed')
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.multiproc_dir, f'metrics-{pid}.json')
+
+    def flush(self) -> None:
+        if not self.multiproc_dir:
+            return
+        os.makedirs(self.multiproc_dir, exist_ok=True)
+        path = self._path(os.getpid())
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as handle:
+            json.dump(self.snapshot(), handle)
+        os.replace(f'{path}.tmp', path)
+
+    def render(self) -> str:
+        snapshots = [self.snapshot()]
+        if self.multiproc_dir and os.path.isdir(self.multiproc_dir):
+            own = os.path.basename(self._path(os.getpid()))
+            for filename in os.listdir(self.multiproc_dir):
+                if filename == own or not filename.startswith('metrics-') or not filename.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(self.multiproc_dir, filename), encoding='utf-8') as handle:
+                        snapshot = json.load(handle)
+                except (OSError, ValueError):
+                    continue
+                if not _pid_alive(int(filename[len('metrics-'):-len('.json')])):
+                    snapshot = {name: metric for name, metric in snapshot.items() if metric['type'] != 'gauge'}
+                snapshots.append(snapshot)
+        return render(snapshots)
+
+    def reset(self) -> None:
+        for metric in self.metrics.values():
+            with metric.lock:
+                metric.values.clear()
+
+
+registry = MetricsRegistry(settings.metrics_multiproc_dir)
+
+http_requests = registry.counter(
+    'http_requests_total',
+    'HTTP requests by method, route template and status code.',
+    ('method', 'route', 'status')
+)
+http_request_duration = registry.histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency by method and route template.',
+    ('method', 'route')
+)
+http_in_flight = registry.gauge('http_requests_in_flight', 'HTTP requests currently being handled.')
+db_pool_connections = registry.gauge(
+    'db_pool_connections',
+    'Database pool connections by engine and state.',
+    ('engine', 'state')
+)
+external_call_duration = registry.histogram(
+    'external_call_duration_seconds',
+    'Calls to external services by service, operation and outcome.',
+    ('service', 'operation', 'outcome'),
+    EXTERNAL_BUCKETS
+)
+
+
+def _collect_pool_usage() -> None:
+    from app.db.session import engine, read_engine
+
+    engines = [('primary', engine)] + ([('replica', read_engine)] if read_engine is not engine else [])
+    for label, db_engine in engines:
+        pool = db_engine.pool
+        # Only QueuePool reports sizes; in-memory SQLite pools have nothing to show.
+        if not hasattr(pool, 'checkedout'):
+            continue
+        db_pool_connections.set((label, 'checked_out'), pool.checkedout())
+        db_pool_connections.set((label, 'idle'), pool.checkedin())
+        db_pool_connections.set((label, 'overflow'), max(pool.overflow(), 0))
+        db_pool_connections.set((label, 'size'), pool.size())
+
+
+registry.add_collector(_collect_pool_usage)
+
+
+def timed_external(service: str, operation: str):
+    """Record the latency of a call to ``service``; raising or returning None counts as an error."""
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                outcome = 'error'
+                try:
+                    result = await func(*args, **kwargs)
+                    if result is not None:
+                        outcome = 'ok'
+                    return result
+                finally:
+                    external_call_duration.observe((service, operation, outcome), time.perf_counter() - started)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = 'error'
+            try:
+                result = func(*args, **kwargs)
+                if result is not None:
+                    outcome = 'ok'
+                return result
+            finally:
+                external_call_duration.observe((service, operation, outcome), time.perf_counter() - started)
+        return wrapper
+
+    return decorator
+
+
+class MetricsMiddleware:
+    """Counts requests and records latency by route template, not raw path."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_in_flight.dec()
+            route = scope.get('route')
+            # Unmatched paths share one label so scanners cannot blow up cardinality.
+            path = getattr(route, 'path', 'unmatched')
+            http_requests.inc((scope['method'], path, str(status_code)))
+            http_request_duration.observe((scope['method'], path), time.perf_counter() - started)
+
+
+async def run_metrics_flush(interval_seconds: float) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            registry.flush()
+        except Exception:
+            logger.exception('Metrics flush failed')
@@ -0,0 +1,101 @@
+import asyncio
+import math
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable
+from fastapi import HTTPException
+from starlette import status
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class PasswordHashPool:
+    """Runs bcrypt work on a dedicated thread pool with a bounded backlog.
+
+    bcrypt releases the GIL while hashing, so a small thread pool keeps the
+    event loop free without the start-up cost of worker processes. Once
+    ``workers + queue_max`` calls are in flight, new calls are rejected with
+    a 503 instead of queueing without limit.
+    """
+
+    def __init__(self, workers: int, queue_max: int) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.capacity = self.workers + max(queue_max, 0)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+        self.pending = 0
+        self.lock = Lock()
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        with self.lock:
+            if self.pending >= self.capacity:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail={
+                        'code': 'SERVICE_BUSY',
+                        'message': 'Too many sign-in requests in progress. Please try again shortly.'
+                    },
+                    headers={'Retry-After': '1'}
+                )
+            self.pending += 1
+
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def _release(self, _future: Future | None = None) -> None:
+        with self.lock:
+            self.pending -= 1
+
+
+class PasswordBatchHasher:
+    """Spreads large hashing batches (bulk imports) over worker processes.
+
+    The process pool is created on first use with the spawn start method, so
+    workers never inherit the server's threads, sockets or event loop. Each
+    call splits its input into one chunk per worker to amortize the IPC cost.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.executor: ProcessPoolExecutor | None = None
+        self.lock = Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self.executor
+
+    async def map_chunks(self, fn: Callable[..., list], items: list, *args: Any) -> list:
+        if not items:
+            return []
+        executor = self._get_executor()
+        size = math.ceil(len(items) / self.workers)
+        futures = [
+            asyncio.wrap_future(executor.submit(fn, items[start:start + size], *args))
+            for start in range(0, len(items), size)
+        ]
+        return [result for chunk in await asyncio.gather(*futures) for result in chunk]
+
+    def shutdown(self) -> None:
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+
+
+password_pool = PasswordHashPool(settings.password_hash_workers, settings.password_hash_queue_max)
+password_batch_hasher = PasswordBatchHasher(settings.password_import_workers)
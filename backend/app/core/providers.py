@@ -0,0 +1,31 @@
+from threading import Lock
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar('T')
+
+
+class Provider(Generic[T]):
+    """Builds an expensive client on first use and hands out the same instance after.
+
+    SDK imports and client construction live in ``factory``, so importing a
+    module that holds a provider costs nothing until a request needs it.
+    """
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        self.factory = factory
+        self.instance: T | None = None
+        self.lock = Lock()
+
+    def get(self) -> T:
+        instance = self.instance
+        if instance is None:
+            with self.lock:
+                if self.instance is None:
+                    self.instance = self.factory()
+                instance = self.instance
+        return instance
+
+    def override(self, instance: T | None) -> None:
+        """Swap in a stand-in client (tests), or None to rebuild on next use."""
+        with self.lock:
+            self.instance = instance
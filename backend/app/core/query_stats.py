@@ -0,0 +1,118 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import get_settings
+from app.core.slow_queries import slow_query_log
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """SQL statements issued while handling one request."""
+
+    __slots__ = ('count', 'duration_ms', 'statements', 'scope')
+
+    def __init__(self, scope: dict | None = None) -> None:
+        self.count = 0
+        self.duration_ms = 0.0
+        self.statements: Counter[str] = Counter()
+        self.scope = scope
+
+    @property
+    def route(self) -> str | None:
+        if self.scope is None:
+            return None
+        # Routing fills in scope['route'] before any query runs.
+        route = self.scope.get('route')
+        return f"{self.scope['method']} {getattr(route, 'path', self.scope['path'])}"
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        # The same parameterized statement run many times is the usual N+1 shape.
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+_current: ContextVar[QueryStats | None] = ContextVar('query_stats', default=None)
+
+
+def current_query_stats() -> QueryStats | None:
+    return _current.get()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # Kept on the execution context, which is discarded with the statement, so a
+    # statement that raises leaves nothing behind on the pooled connection.
+    context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed_ms = (time.perf_counter() - context._query_started) * 1000
+    stats = _current.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration_ms += elapsed_ms
+        stats.statements[statement] += 1
+    if slow_query_log.threshold_ms and elapsed_ms >= slow_query_log.threshold_ms:
+        slow_query_log.record(conn, statement, parameters, executemany, elapsed_ms, stats.route if stats else None)
+
+
+class QueryStatsMiddleware:
+    """Counts queries and DB time per request.
+
+    Sync routes and dependencies run on worker threads, which inherit the
+    request's context, so every statement they issue lands in the same
+    ``QueryStats``. With ``QUERY_STATS_HEADERS`` on, responses carry
+    ``X-DB-Query-Count`` and ``X-DB-Query-Time-Ms``; requests over the query
+    budget, or repeating one statement ``QUERY_REPEAT_WARNING`` times, are
+    logged as warnings.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+        token = _current.set(stats)
+
+        async def send_with_headers(message) -> None:
+            if message['type'] == 'http.response.start' and settings.query_stats_headers:
+                # Queries issued after the response starts (background tasks) are not counted here.
+                headers = list(message.get('headers', []))
+                headers.append((b'x-db-query-count', str(stats.count).encode()))
+                headers.append((b'x-db-query-time-ms', f'{stats.duration_ms:.1f}'.encode()))
+                message = {**message, 'headers': headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current.reset(token)
+            self._check_budget(scope, stats)
+
+    @staticmethod
+    def _check_budget(scope, stats: QueryStats) -> None:
+        if not stats.count:
+            return
+        route = scope.get('route')
+        path = getattr(route, 'path', scope['path'])
+        if settings.query_budget_per_request and stats.count > settings.query_budget_per_request:
+            logger.warning(
+                '%s %s issued %s queries (budget %s) in %.1f ms',
+                scope['method'],
+                path,
+                stats.count,
+                settings.query_budget_per_request,
+                stats.duration_ms
+            )
+        if settings.query_repeat_warning:
+            for statement, count in stats.repeated(settings.query_repeat_warning):
+                logger.warning('%s %s ran the same query %s times: %s', scope['method'], path, count, statement)
@@ -1,38 +1,165 @@
+import math
+import sqlite3
+import threading
 import time
-from collections import deque
 from threading import Lock
 from fastapi import HTTPException, Request
 from starlette import status
+from app.core.config import get_settings
 
+settings = get_settings()
 
-class RateLimiter:
-    def __init__(self) -> None:
-        self.storage: dict[str, deque] = {}
+
+def _estimate(window_start: int, prev_count: int, curr_count: int, window: int, now: float) -> tuple[int, int, int]:
+    """Roll a key's counters forward to ``now`` and return (window_start, prev, curr).
+
+    The sliding-window counter approximates the request count over the last
+    ``window`` seconds as ``prev * (1 - elapsed_fraction) + curr``, which needs
+    two integers per key instead of one timestamp per request.
+    """
+    current = int(now // window)
+    if window_start == current:
+        return window_start, prev_count, curr_count
+    if window_start == current - 1:
+        return current, curr_count, 0
+    return current, 0, 0
+
+
+def _allowed(prev_count: int, curr_count: int, limit: int, window: int, now: float) -> bool:
+    elapsed = (now % window) / window
+    return prev_count * (1 - elapsed) + curr_count < limit
+
+
+class MemoryBackend:
+    def __init__(self, sweep_interval_seconds: float = 60.0) -> None:
+        # key -> [window_start, prev_count, curr_count, expires_at]
+        self.storage: dict[str, list] = {}
         self.lock = Lock()
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.next_sweep = 0.0
 
-    def is_allowed(self, key: str, limit: int, window_seconds: int) -> bool:
-        now = time.time()
+    def hit(self, key: str, limit: int, window_seconds: int, now: float) -> bool:
         with self.lock:
-            window = self.storage.get(key)
-            if window is None:
-                window = deque()
-                self.storage[key] = window
+            if now >= self.next_sweep:
+                self._sweep(now)
 
-            while window and window[0] <= now - window_seconds:
-                window.popleft()
+            entry = self.storage.get(key)
+            if entry is None:
+                entry = [int(now // window_seconds), 0, 0, 0.0]
+                self.storage[key] = entry
+            window_start, prev_count, curr_count = _estimate(entry[0], entry[1], entry[2], window_seconds, now)
+            # Once two windows pass without a hit the key carries no state worth keeping.
+            entry[:] = [window_start, prev_count, curr_count, (window_start + 2) * window_seconds]
 
-            if len(window) >= limit:
+            if not _allowed(prev_count, curr_count, limit, window_seconds, now):
                 return False
+            entry[2] += 1
+            return True
+
+    def _sweep(self, now: float) -> None:
+        self.next_sweep = now + self.sweep_interval_seconds
+        for key in [key for key, entry in self.storage.items() if entry[3] <= now]:
+            del self.storage[key]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.storage.clear()
+            self.next_sweep = 0.0
+
+
+class SQLiteBackend:
+    """File-backed counters shared by every worker process on the host."""
+
+    def __init__(self, path: str, sweep_interval_seconds: float = 60.0) -> None:
+        self.path = path
+        self.local = threading.local()
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.next_sweep = 0.0
+        # Guards next_sweep: hits arrive on every threadpool thread.
+        self.sweep_lock = Lock()
+        with self._connection() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS rate_limits ('
+                'key TEXT PRIMARY KEY, window_start INTEGER NOT NULL, prev_count INTEGER NOT NULL, '
+                'curr_count INTEGER NOT NULL, expires_at REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS ix_rate_limits_expires_at ON rate_limits (expires_at)')
 
-            window.append(now)
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+        return connection
+
+    def _sweep_due(self, now: float) -> bool:
+        with self.sweep_lock:
+            if now < self.next_sweep:
+                return False
+            self.next_sweep = now + self.sweep_interval_seconds
             return True
 
+    def hit(self, key: str, limit: int, window_seconds: int, now: float) -> bool:
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            if self._sweep_due(now):
+                connection.execute('DELETE FROM rate_limits WHERE expires_at <= ?', (now,))
+
+            row = connection.execute(
+                'SELECT window_start, prev_count, curr_count FROM rate_limits WHERE key = ?',
+                (key,)
+            ).fetchone()
+            if row is None:
+                row = (int(now // window_seconds), 0, 0)
+            window_start, prev_count, curr_count = _estimate(*row, window_seconds, now)
+
+            allowed = _allowed(prev_count, curr_count, limit, window_seconds, now)
+            if allowed:
+                curr_count += 1
+            connection.execute(
+                'INSERT INTO rate_limits (key, window_start, prev_count, curr_count, expires_at) '
+                'VALUES (?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET '
+                'window_start = excluded.window_start, prev_count = excluded.prev_count, '
+                'curr_count = excluded.curr_count, expires_at = excluded.expires_at',
+                (key, window_start, prev_count, curr_count, (window_start + 2) * window_seconds)
+            )
+            connection.execute('COMMIT')
+            return allowed
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+
+    def clear(self) -> None:
+        self._connection().execute('DELETE FROM rate_limits')
+
+
+class RateLimiter:
+    def __init__(self, backend: MemoryBackend | SQLiteBackend) -> None:
+        self.backend = backend
+
+    def is_allowed(self, key: str, limit: int, window_seconds: int) -> bool:
+        return self.backend.hit(key, limit, window_seconds, time.time())
+
+    def reset(self) -> None:
+        self.backend.clear()
+
+
+def create_backend() -> MemoryBackend | SQLiteBackend:
+    if settings.rate_limit_backend == 'sqlite':
+        return SQLiteBackend(settings.rate_limit_sqlite_path)
+    return MemoryBackend()
+
 
-limiter = RateLimiter()
+limiter = RateLimiter(create_backend())
 
 
 def rate_limit(limit: int, window_seconds: int):
-    async def dependency(request: Request) -> None:
+    # Plain def so FastAPI runs it in the threadpool: the SQLite backend blocks
+    # on the database write lock for up to its busy timeout.
+    def dependency(request: Request) -> None:
         client_ip = request.client.host if request.client else 'unknown'
         key = f'{client_ip}:{request.url.path}'
         if not limiter.is_allowed(key, limit, window_seconds):
@@ -41,7 +168,8 @@ def rate_limit(limit: int, window_seconds: int):
                 detail={
                     'code': 'RATE_LIMITED',
                     'message': 'Too many requests. Please try again later.'
-                }
+                },
+                headers={'Retry-After': str(math.ceil(window_seconds - time.time() % window_seconds))}
             )
 
     return dependency
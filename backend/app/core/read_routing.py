@@ -0,0 +1,52 @@
+import time
+from threading import Lock
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class RecentWriters:
+    """Users who committed a write within the last ``window_seconds``.
+
+    Reads for these users go to the primary so they see their own writes
+    while the replica catches up. Entries are process-local, like the
+    principal cache; put workers behind a sticky load balancer if
+    read-your-writes must hold across workers.
+    """
+
+    def __init__(self, window_seconds: float) -> None:
+        self.window_seconds = window_seconds
+        self.until: dict[str, float] = {}
+        self.lock = Lock()
+
+    def mark(self, user_id: str) -> None:
+        if self.window_seconds <= 0:
+            return
+        now = time.monotonic()
+        with self.lock:
+            self.until[user_id] = now + self.window_seconds
+            # Writers are few between sweeps; drop anyone whose window has passed.
+            if len(self.until) > 1024:
+                for key in [key for key, deadline in self.until.items() if deadline <= now]:
+                    del self.until[key]
+
+    def is_recent(self, user_id: str) -> bool:
+        with self.lock:
+            deadline = self.until.get(user_id)
+            if deadline is None:
+                return False
+            if deadline <= time.monotonic():
+                del self.until[user_id]
+                return False
+            return True
+
+    def any_recent(self) -> bool:
+        # Unlocked fast path so anonymous and idle traffic skips token decoding.
+        return bool(self.until)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.until.clear()
+
+
+recent_writers = RecentWriters(settings.read_your_writes_seconds)
@@ -0,0 +1,147 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Iterable
+
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class Viewport:
+    min_lat: float
+    min_lng: float
+    max_lat: float
+    max_lng: float
+
+    def contains(self, lat: float | None, lng: float | None) -> bool:
+        if lat is None or lng is None:
+            return False
+        return self.min_lat <= lat <= self.max_lat and self.min_lng <= lng <= self.max_lng
+
+
+class Subscriber:
+    """A single WebSocket connection; only ever touched from its own event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int = SUBSCRIBER_QUEUE_SIZE) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=queue_size)
+        self.station_ids: frozenset[str] = frozenset()
+        self.viewport: Viewport | None = None
+        self.overflowed = False
+
+    def deliver(self, message: str) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A consumer this far behind cannot rebuild state from deltas; drop
+            # what is queued and ask the pump to close so the client resyncs.
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class StationEventHub:
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.by_station: dict[str, set[Subscriber]] = {}
+        self.viewport_subscribers: set[Subscriber] = set()
+
+    def connect(self, loop: asyncio.AbstractEventLoop) -> Subscriber:
+        return Subscriber(loop)
+
+    def subscribe(
+        self,
+        subscriber: Subscriber,
+        station_ids: Iterable[str],
+        viewport: Viewport | None
+    ) -> None:
+        with self.lock:
+            self._remove(subscriber)
+            subscriber.station_ids = frozenset(station_ids)
+            subscriber.viewport = viewport
+            for station_id in subscriber.station_ids:
+                self.by_station.setdefault(station_id, set()).add(subscriber)
+            if viewport is not None:
+                self.viewport_subscribers.add(subscriber)
+
+    def disconnect(self, subscriber: Subscriber) -> None:
+        with self.lock:
+            self._remove(subscriber)
+
+    def _remove(self, subscriber: Subscriber) -> None:
+        for station_id in subscriber.station_ids:
+            subscribers = self.by_station.get(station_id)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.by_station[station_id]
+        self.viewport_subscribers.discard(subscriber)
+
+    def publish(self, event: dict[str, Any]) -> int:
+        return self.publish_many([event])
+
+    def publish_many(self, events: Iterable[dict[str, Any]]) -> int:
+        """Serialize each event once and hand the same string to every match.
+
+        Safe to call from any thread: delivery is scheduled onto each
+        subscriber's own loop.
+        """
+        deliveries: list[tuple[Subscriber, str]] = []
+        with self.lock:
+            for event in events:
+                targets = set(self.by_station.get(event['stationId'], ()))
+                for subscriber in self.viewport_subscribers:
+                    if subscriber.viewport.contains(event.get('lat'), event.get('lng')):
+                        targets.add(subscriber)
+                if not targets:
+                    continue
+                message = json.dumps(event, separators=(',', ':'))
+                deliveries.extend((subscriber, message) for subscriber in targets)
+
+        for subscriber, message in deliveries:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.deliver, message)
+            except RuntimeError:
+                # Loop already closed; the connection is going away.
+                continue
+        return len(deliveries)
+
+    def subscriber_count(self) -> int:
+        with self.lock:
+            subscribers = set(self.viewport_subscribers)
+            for station_subscribers in self.by_station.values():
+                subscribers.update(station_subscribers)
+            return len(subscribers)
+
+
+def station_status_event(station) -> dict[str, Any]:
+    return {
+        'type': 'station.status',
+        'stationId': station.id,
+        'status': station.status,
+        'lat': station.lat,
+        'lng': station.lng
+    }
+
+
+def station_slots_event(
+    station,
+    booked: list[str] | None = None,
+    released: list[str] | None = None
+) -> dict[str, Any]:
+    return {
+        'type': 'station.slots',
+        'stationId': station.id,
+        'booked': booked or [],
+        'released': released or [],
+        'lat': station.lat,
+        'lng': station.lng
+    }
+
+
+station_events = StationEventHub()
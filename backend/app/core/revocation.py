@@ -0,0 +1,82 @@
+import time
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Iterable
+from sqlalchemy.orm import Session
+from app.core.config import get_settings
+from app.db.models.session import Session as DbSession
+
+settings = get_settings()
+
+# Re-read this far behind the newest revocation seen, so rows committed late by
+# another worker (with an older revoked_at) are still picked up.
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class RevocationList:
+    """In-memory set of revoked session ids for stateless token checks.
+
+    A session revoked at T can only have access tokens that expire before
+    T + access token lifetime, so entries are forgotten after that. Other
+    workers learn about revocations by polling ``sessions.revoked_at``, which
+    acts as the shared store; the poll is one indexed range scan per interval.
+    """
+
+    def __init__(self, token_lifetime: timedelta, sync_interval_seconds: int) -> None:
+        self.token_lifetime = token_lifetime
+        self.sync_interval_seconds = sync_interval_seconds
+        self.revoked: dict[str, datetime] = {}
+        self.watermark: datetime | None = None
+        self.next_sync = 0.0
+        self.lock = Lock()
+
+    def revoke(self, session_ids: Iterable[str], revoked_at: datetime | None = None) -> None:
+        # sync() only runs in stateless mode, so prune here too or the list grows forever.
+        utcnow = datetime.utcnow()
+        forget_at = (revoked_at or utcnow) + self.token_lifetime
+        with self.lock:
+            self._forget_expired(utcnow)
+            for session_id in session_ids:
+                self.revoked[session_id] = forget_at
+
+    def _forget_expired(self, utcnow: datetime) -> None:
+        for session_id in [sid for sid, forget_at in self.revoked.items() if forget_at <= utcnow]:
+            del self.revoked[session_id]
+
+    def is_revoked(self, session_id: str) -> bool:
+        with self.lock:
+            return session_id in self.revoked
+
+    def sync(self, db: Session, force: bool = False) -> None:
+        now = time.monotonic()
+        with self.lock:
+            if not force and now < self.next_sync:
+                return
+            self.next_sync = now + self.sync_interval_seconds
+            since = datetime.utcnow() - self.token_lifetime
+            if self.watermark is not None:
+                since = max(since, self.watermark - SYNC_OVERLAP)
+
+        rows = db.query(DbSession.id, DbSession.revoked_at).filter(DbSession.revoked_at >= since).all()
+
+        utcnow = datetime.utcnow()
+        with self.lock:
+            for session_id, revoked_at in rows:
+                self.revoked[session_id] = revoked_at + self.token_lifetime
+                if self.watermark is None or revoked_at > self.watermark:
+                    self.watermark = revoked_at
+            if self.watermark is None:
+                self.watermark = since
+            self._forget_expired(utcnow)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.revoked.clear()
+            self.watermark = None
+            self.next_sync = 0.0
+
+
+revocation_list = RevocationList(
+    token_lifetime=timedelta(minutes=settings.access_token_expire_minutes),
+    sync_interval_seconds=settings.auth_revocation_sync_seconds
+)
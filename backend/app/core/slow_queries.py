@@ -0,0 +1,124 @@
+import logging
+from dataclasses import dataclass, field
+from threading import Lock
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+EXPLAINABLE = ('select', 'with', 'update', 'delete')
+MAX_ROUTES_PER_STATEMENT = 10
+
+
+@dataclass
+class SlowQuery:
+    statement: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    routes: dict[str, int] = field(default_factory=dict)
+    plan: list[str] | None = None
+
+
+def _explain(dbapi_connection, dialect_name: str, statement: str, parameters) -> list[str]:
+    if dialect_name == 'sqlite':
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+            return [' '.join(str(column) for column in row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    # A failed statement would abort the caller's transaction on Postgres, so
+    # fence the EXPLAIN with a savepoint.
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute('SAVEPOINT slow_query_explain')
+        try:
+            cursor.execute('EXPLAIN ' + statement, parameters)
+            plan = [' '.join(str(column) for column in row) for row in cursor.fetchall()]
+        except Exception:
+            cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+            raise
+        cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+        return plan
+    finally:
+        cursor.close()
+
+
+class SlowQueryLog:
+    """Statements slower than ``threshold_ms``, aggregated by SQL text.
+
+    Parameters are never stored or logged, only their count. The plan is
+    captured the first time a statement is slow, on the same connection and
+    with the same parameters, so it reflects the case that was actually
+    slow. Entries are per worker; at most ``max_statements`` distinct
+    statements are tracked.
+    """
+
+    def __init__(self, threshold_ms: float, max_statements: int) -> None:
+        self.threshold_ms = threshold_ms
+        self.max_statements = max_statements
+        self.entries: dict[str, SlowQuery] = {}
+        self.lock = Lock()
+
+    def record(
+        self,
+        conn,
+        statement: str,
+        parameters,
+        executemany: bool,
+        elapsed_ms: float,
+        route: str | None
+    ) -> None:
+        param_count = len(parameters) if parameters and not executemany else 0
+        logger.warning(
+            'Slow query (%.1f ms) on %s: %s [%s parameters redacted]',
+            elapsed_ms,
+            route or 'no route',
+            statement,
+            param_count
+        )
+
+        with self.lock:
+            entry = self.entries.get(statement)
+            if entry is None:
+                if len(self.entries) >= self.max_statements:
+                    return
+                entry = self.entries[statement] = SlowQuery(statement)
+            entry.count += 1
+            entry.total_ms += elapsed_ms
+            entry.max_ms = max(entry.max_ms, elapsed_ms)
+            if route and (route in entry.routes or len(entry.routes) < MAX_ROUTES_PER_STATEMENT):
+                entry.routes[route] = entry.routes.get(route, 0) + 1
+            needs_plan = entry.plan is None
+            if needs_plan:
+                # Claim the capture so concurrent slow runs do not explain it again.
+                entry.plan = []
+
+        if not needs_plan:
+            return
+        if executemany or not statement.lstrip().lower().startswith(EXPLAINABLE):
+            plan = ['(no plan for this statement type)']
+        else:
+            try:
+                plan = _explain(conn.connection, conn.dialect.name, statement, parameters)
+            except Exception as exc:
+                plan = [f'(EXPLAIN failed: {exc.__class__.__name__})']
+        with self.lock:
+            entry.plan = plan
+
+    def top(self, limit: int) -> list[SlowQuery]:
+        with self.lock:
+            entries = sorted(self.entries.values(), key=lambda entry: entry.total_ms, reverse=True)[:limit]
+            return [
+                SlowQuery(entry.statement, entry.count, entry.total_ms, entry.max_ms, dict(entry.routes), list(entry.plan or []))
+                for entry in entries
+            ]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+slow_query_log = SlowQueryLog(settings.slow_query_ms, settings.slow_query_max_statements)
@@ -0,0 +1,158 @@
+"""
+Purge expired and revoked auth rows and delivered email, and archive old
+bookings, in bounded batches.
+
+    python -m app.db.maintenance --batch-size 1000
+
+Each batch is its own short transaction, so a large backlog never holds
+locks on the auth or booking tables for long.
+"""
+import argparse
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import and_, insert, literal, or_, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import get_settings
+from app.db.models.booking import Booking, BookingArchive
+from app.db.models.email_outbox import EmailOutbox
+from app.db.models.email_verification import EmailVerificationToken
+from app.db.models.password_reset import PasswordResetToken
+from app.db.models.session import Session as DbSession
+from app.db.session import SessionLocal
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Delivered or abandoned messages are kept for a week to help with support questions.
+# Verification and reset mail is deleted on send and loses its link on failure,
+# so nothing kept here can be used to take over an account.
+OUTBOX_RETENTION = timedelta(days=7)
+TERMINAL_BOOKING_STATUSES = ('COMPLETED', 'CANCELLED')
+ARCHIVED_BOOKING_COLUMNS = [
+    'id',
+    'station_id',
+    'host_id',
+    'driver_id',
+    'driver_name',
+    'driver_phone_number',
+    'status',
+    'start_time',
+    'rating',
+    'review',
+    'created_at',
+    'updated_at'
+]
+
+
+def _delete_in_batches(db: Session, model, condition, batch_size: int) -> int:
+    deleted = 0
+    while True:
+        ids = [row[0] for row in db.query(model.id).filter(condition).limit(batch_size).all()]
+        if not ids:
+            return deleted
+        db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            return deleted
+
+
+def purge_auth_rows(db: Session, batch_size: int, now: datetime | None = None) -> dict[str, int]:
+    now = now or datetime.utcnow()
+    # Revoked sessions stay until every access token minted for them has expired,
+    # so the stateless revocation list can still learn about them.
+    revoked_before = now - timedelta(minutes=settings.access_token_expire_minutes)
+    return {
+        'sessions': _delete_in_batches(
+            db,
+            DbSession,
+            or_(DbSession.expires_at <= now, DbSession.revoked_at <= revoked_before),
+            batch_size
+        ),
+        'email_verification_tokens': _delete_in_batches(
+            db,
+            EmailVerificationToken,
+            or_(EmailVerificationToken.expires_at <= now, EmailVerificationToken.used_at.is_not(None)),
+            batch_size
+        ),
+        'password_reset_tokens': _delete_in_batches(
+            db,
+            PasswordResetToken,
+            or_(PasswordResetToken.expires_at <= now, PasswordResetToken.used_at.is_not(None)),
+            batch_size
+        ),
+        'email_outbox': _delete_in_batches(
+            db,
+            EmailOutbox,
+            and_(EmailOutbox.status != 'pending', EmailOutbox.created_at <= now - OUTBOX_RETENTION),
+            batch_size
+        )
+    }
+
+
+def archive_bookings(db: Session, older_than: timedelta, batch_size: int, now: datetime | None = None) -> int:
+    """Move COMPLETED and CANCELLED bookings created before ``now - older_than`` to ``bookings_archive``.
+
+    Each batch copies and deletes the same ids in one transaction, so a row is
+    always in exactly one of the two tables.
+    """
+    cutoff = (now or datetime.utcnow()) - older_than
+    archived_at = datetime.utcnow()
+    condition = and_(Booking.status.in_(TERMINAL_BOOKING_STATUSES), Booking.created_at < cutoff)
+    columns = [getattr(Booking, name) for name in ARCHIVED_BOOKING_COLUMNS]
+    archived = 0
+    while True:
+        ids = [row[0] for row in db.query(Booking.id).filter(condition).limit(batch_size).all()]
+        if not ids:
+            return archived
+        db.execute(
+            insert(BookingArchive).from_select(
+                [*ARCHIVED_BOOKING_COLUMNS, 'archived_at'],
+                select(*columns, literal(archived_at)).where(Booking.id.in_(ids))
+            )
+        )
+        db.query(Booking).filter(Booking.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        archived += len(ids)
+        if len(ids) < batch_size:
+            return archived
+
+
+def run_purge(batch_size: int | None = None) -> dict[str, int]:
+    batch_size = batch_size or settings.maintenance_batch_size
+    db = SessionLocal()
+    try:
+        counts = purge_auth_rows(db, batch_size)
+        if settings.booking_archive_after_days > 0:
+            counts['bookings_archived'] = archive_bookings(
+                db,
+                timedelta(days=settings.booking_archive_after_days),
+                batch_size
+            )
+        return counts
+    finally:
+        db.close()
+
+
+async def run_periodic_purge(interval_seconds: int) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            deleted = await run_in_threadpool(run_purge)
+            logger.info('Maintenance purge: %s', deleted)
+        except Exception:
+            logger.exception('Maintenance purge failed')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=settings.maintenance_batch_size)
+    args = parser.parse_args()
+    print(json.dumps(run_purge(args.batch_size)))
+
+
+if __name__ == '__main__':
+    main()
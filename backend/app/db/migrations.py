@@ -0,0 +1,255 @@
+"""
+Versioned schema migrations.
+
+    python -m app.db.migrations            # apply pending migrations
+    python -m app.db.migrations --status   # print current and latest version
+
+Applied versions are recorded in ``schema_version``. Startup only reads that
+table and compares it with the latest version here, so a current database
+costs one query per worker boot instead of reflecting every table.
+
+Version 1 creates the full schema from the models on an empty database. Later
+versions bring databases created before them up to date; each step checks
+for its column or index first, so a fresh database passes through them as
+no-ops. Indexes are built with ``CREATE INDEX CONCURRENTLY`` on Postgres so
+writes keep flowing while they build. Concurrent runners are serialised by an
+advisory lock on Postgres and by ``BEGIN IMMEDIATE`` per migration on SQLite.
+Append new migrations to the end of ``MIGRATIONS``; never renumber or edit one
+that has shipped.
+"""
+import argparse
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    inspect,
+    insert,
+    select,
+    text,
+    update
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key for pg_advisory_lock so concurrent worker boots migrate one at a time.
+ADVISORY_LOCK_ID = 4_187_301
+ADVISORY_LOCK_POLL_SECONDS = 0.5
+
+version_metadata = MetaData()
+schema_version = Table(
+    'schema_version',
+    version_metadata,
+    Column('version', Integer, primary_key=True),
+    Column('name', String(100), nullable=False),
+    Column('applied_at', DateTime, nullable=False)
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+def _has_column(conn: Connection, table: str, column: str) -> bool:
+    return any(item['name'] == column for item in inspect(conn).get_columns(table))
+
+
+def _has_index(conn: Connection, table: str, name: str) -> bool:
+    return any(item['name'] == name for item in inspect(conn).get_indexes(table))
+
+
+def add_column(conn: Connection, table: str, column: str, ddl: str) -> bool:
+    if _has_column(conn, table, column):
+        return False
+    conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+    return True
+
+
+def create_index(conn: Connection, name: str, table: str, columns: list[str]) -> None:
+    column_list = ', '.join(columns)
+    if conn.dialect.name == 'postgresql':
+        # CONCURRENTLY cannot run inside a transaction and waits out older ones, so
+        # check and build on a separate autocommit connection without touching
+        # ``conn``. A failed build leaves an INVALID index behind; drop it before retrying.
+        with conn.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as index_conn:
+            if not _has_index(index_conn, table, name):
+                index_conn.execute(text(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({column_list})'))
+        return
+    if not _has_index(conn, table, name):
+        conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({column_list})'))
+
+
+def _create_schema(conn: Connection) -> None:
+    from app.db.base import Base
+    import app.db.models  # noqa: F401  register every table on Base.metadata
+
+    Base.metadata.create_all(bind=conn)
+
+
+def _add_vehicle_number(conn: Connection) -> None:
+    add_column(conn, 'driver_profiles', 'vehicle_number', 'VARCHAR(20) NULL')
+
+
+def _add_booking_review(conn: Connection) -> None:
+    add_column(conn, 'bookings', 'rating', 'INTEGER')
+    add_column(conn, 'bookings', 'review', 'TEXT')
+
+
+def _add_user_profile_flags(conn: Connection) -> None:
+    from app.db.models.driver_profile import DriverProfile
+    from app.db.models.host_profile import HostProfile
+    from app.db.models.user import User
+
+    if add_column(conn, 'users', 'driver_profile_complete', 'BOOLEAN NOT NULL DEFAULT FALSE'):
+        conn.execute(
+            update(User.__table__)
+            .where(User.__table__.c.id.in_(select(DriverProfile.__table__.c.user_id)))
+            .values(driver_profile_complete=True)
+        )
+    if add_column(conn, 'users', 'host_profile_complete', 'BOOLEAN NOT NULL DEFAULT FALSE'):
+        conn.execute(
+            update(User.__table__)
+            .where(User.__table__.c.id.in_(select(HostProfile.__table__.c.user_id)))
+            .values(host_profile_complete=True)
+        )
+
+
+def _add_sessions_revoked_at_index(conn: Connection) -> None:
+    create_index(conn, 'ix_sessions_revoked_at', 'sessions', ['revoked_at'])
+
+
+def _add_auth_expires_at_indexes(conn: Connection) -> None:
+    create_index(conn, 'ix_sessions_expires_at', 'sessions', ['expires_at'])
+    create_index(conn, 'ix_email_verification_tokens_expires_at', 'email_verification_tokens', ['expires_at'])
+    create_index(conn, 'ix_password_reset_tokens_expires_at', 'password_reset_tokens', ['expires_at'])
+
+
+def _add_users_created_at_index(conn: Connection) -> None:
+    create_index(conn, 'ix_users_created_at_id', 'users', ['created_at', 'id'])
+
+
+def _add_email_outbox(conn: Connection) -> None:
+    from app.db.models.email_outbox import EmailOutbox
+
+    EmailOutbox.__table__.create(bind=conn, checkfirst=True)
+
+
+def _add_bookings_archive(conn: Connection) -> None:
+    from app.db.models.booking import BookingArchive
+
+    BookingArchive.__table__.create(bind=conn, checkfirst=True)
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, 'create_schema', _create_schema),
+    Migration(2, 'add_vehicle_number', _add_vehicle_number),
+    Migration(3, 'add_booking_review', _add_booking_review),
+    Migration(4, 'add_user_profile_flags', _add_user_profile_flags),
+    Migration(5, 'add_sessions_revoked_at_index', _add_sessions_revoked_at_index),
+    Migration(6, 'add_auth_expires_at_indexes', _add_auth_expires_at_indexes),
+    Migration(7, 'add_users_created_at_index', _add_users_created_at_index),
+    Migration(8, 'add_email_outbox', _add_email_outbox),
+    Migration(9, 'add_bookings_archive', _add_bookings_archive)
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(engine: Engine) -> int:
+    """Highest applied version, or 0 when the database has never been migrated."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+    except DBAPIError:
+        # No schema_version table yet.
+        return 0
+
+
+def _applied_versions(conn: Connection) -> set[int]:
+    return set(conn.execute(select(schema_version.c.version)).scalars())
+
+
+def _acquire_advisory_lock(lock_conn: Connection, poll_seconds: float = ADVISORY_LOCK_POLL_SECONDS) -> None:
+    # Poll with pg_try_advisory_lock on an autocommit connection instead of
+    # blocking in pg_advisory_lock: a blocked statement holds a snapshot, and
+    # CREATE INDEX CONCURRENTLY in the worker that owns the lock waits for every
+    # older snapshot, so waiting workers and the index build would deadlock
+    # across backends where Postgres cannot detect it.
+    while not lock_conn.execute(text('SELECT pg_try_advisory_lock(:id)'), {'id': ADVISORY_LOCK_ID}).scalar():
+        time.sleep(poll_seconds)
+
+
+def migrate(engine: Engine, target: int | None = None) -> list[int]:
+    """Apply pending migrations up to ``target`` and return the versions applied."""
+    target = LATEST_VERSION if target is None else target
+    if current_version(engine) >= target:
+        return []
+
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as lock_conn:
+        if engine.dialect.name == 'postgresql':
+            _acquire_advisory_lock(lock_conn)
+        try:
+            if engine.dialect.name != 'sqlite':
+                version_metadata.create_all(bind=engine)
+            with engine.connect() as conn:
+                # Another worker may have finished while this one waited for the lock.
+                applied = _applied_versions(conn) if inspect(conn).has_table('schema_version') else set()
+            done = []
+            for migration in MIGRATIONS:
+                if migration.version > target or migration.version in applied:
+                    continue
+                # One transaction per migration: a failure leaves earlier versions recorded.
+                with engine.begin() as conn:
+                    if engine.dialect.name == 'sqlite':
+                        # SQLite has no advisory lock; take the database write lock up
+                        # front and recheck, so workers booting together on a fresh
+                        # file apply each version once instead of racing on it.
+                        conn.exec_driver_sql('BEGIN IMMEDIATE')
+                        version_metadata.create_all(bind=conn)
+                        if migration.version in _applied_versions(conn):
+                            continue
+                    logger.info('Applying migration %s %s', migration.version, migration.name)
+                    migration.apply(conn)
+                    conn.execute(insert(schema_version).values(
+                        version=migration.version,
+                        name=migration.name,
+                        applied_at=datetime.utcnow()
+                    ))
+                done.append(migration.version)
+            return done
+        finally:
+            if engine.dialect.name == 'postgresql':
+                lock_conn.execute(text('SELECT pg_advisory_unlock(:id)'), {'id': ADVISORY_LOCK_ID})
+
+
+def main() -> None:
+    from app.db.session import engine
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--status', action='store_true', help='print versions without migrating')
+    parser.add_argument('--target', type=int, default=None, help='stop after this version')
+    args = parser.parse_args()
+
+    if args.status:
+        print(json.dumps({'current': current_version(engine), 'latest': LATEST_VERSION}))
+        return
+    print(json.dumps({'applied': migrate(engine, args.target), 'current': current_version(engine)}))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
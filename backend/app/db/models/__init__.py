@@ -2,8 +2,9 @@ from app.db.models.user import User
 from app.db.models.session import Session
 from app.db.models.email_verification import EmailVerificationToken
 from app.db.models.password_reset import PasswordResetToken
+from app.db.models.email_outbox import EmailOutbox
 from app.db.models.station import Station
-from app.db.models.booking import Booking
+from app.db.models.booking import Booking, BookingArchive
 from app.db.models.driver_profile import DriverProfile
 from app.db.models.host_profile import HostProfile
 
@@ -12,8 +13,10 @@ __all__ = [
     'Session',
     'EmailVerificationToken',
     'PasswordResetToken',
+    'EmailOutbox',
     'Station',
     'Booking',
+    'BookingArchive',
     'DriverProfile',
     'HostProfile'
 ]
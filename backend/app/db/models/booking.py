@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, DateTime, ForeignKey, Integer, Text
+from sqlalchemy import String, DateTime, ForeignKey, Index, Integer, Text
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.base import Base
 
@@ -24,3 +24,29 @@ class Booking(Base):
         default=datetime.utcnow,
         onupdate=datetime.utcnow
     )
+
+
+class BookingArchive(Base):
+    """Terminal bookings moved out of ``bookings`` by the archival job; same ids and columns."""
+
+    __tablename__ = 'bookings_archive'
+    # History pages read these newest first per driver, station or host.
+    __table_args__ = (
+        Index('ix_bookings_archive_driver_id_created_at', 'driver_id', 'created_at'),
+        Index('ix_bookings_archive_station_id_created_at', 'station_id', 'created_at'),
+        Index('ix_bookings_archive_host_id_created_at', 'host_id', 'created_at')
+    )
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    station_id: Mapped[str] = mapped_column(String(36), ForeignKey('stations.id'), nullable=False)
+    host_id: Mapped[str] = mapped_column(String(36), ForeignKey('users.id'), nullable=False)
+    driver_id: Mapped[str] = mapped_column(String(36), ForeignKey('users.id'), nullable=False)
+    driver_name: Mapped[str] = mapped_column(String(120), nullable=False)
+    driver_phone_number: Mapped[str] = mapped_column(String(30), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    start_time: Mapped[str | None] = mapped_column(String(40), nullable=True)
+    rating: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    review: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
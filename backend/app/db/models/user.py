@@ -1,12 +1,14 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Boolean, DateTime, JSON
+from sqlalchemy import String, Boolean, DateTime, Index, JSON
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.base import Base
 
 
 class User(Base):
     __tablename__ = 'users'
+    # Keyset pagination for the admin user list walks (created_at, id) in order.
+    __table_args__ = (Index('ix_users_created_at_id', 'created_at', 'id'),)
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     username: Mapped[str] = mapped_column(String(50), unique=True, index=True, nullable=False)
@@ -16,6 +18,9 @@ class User(Base):
     role: Mapped[str] = mapped_column(String(20), default='member', nullable=False)
     permissions: Mapped[list] = mapped_column(JSON, default=list, nullable=False)
     email_verified: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    # Denormalized from driver_profiles/host_profiles; maintained by the profile upserts.
+    driver_profile_complete: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    host_profile_complete: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime,
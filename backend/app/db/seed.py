@@ -1,6 +1,30 @@
-from typing import List
+"""
+Demo stations for local development, and a bulk synthetic data generator.
+
+    python -m app.db.seed --hosts 1000 --drivers 50000 --stations 20000 --bookings 1000000
+
+The generator spreads stations around several cities and writes hosts,
+drivers, profiles, stations and historical bookings with reviews using
+chunked bulk inserts. All synthetic users share one password hash,
+computed once. Station ratings and review counts are then filled in with a
+single set-based UPDATE.
+"""
+import argparse
+import json
+import random
+import time
+from bisect import bisect
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Iterator, List
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 from app.core.config import get_settings
+from app.db.models.booking import Booking
+from app.db.models.driver_profile import DriverProfile
+from app.db.models.host_profile import HostProfile
 from app.db.models.station import Station
 from app.db.models.user import User
 from app.security import hash_password
@@ -159,3 +183,296 @@ def ensure_global_demo_stations(db: Session) -> List[Station]:
 
     db.commit()
     return stations
+
+
+# (name, lat, lng, spread in degrees, weight): bigger metros get more stations.
+SYNTHETIC_CITIES = [
+    ('Pune', 18.5204, 73.8567, 0.08, 3),
+    ('Mumbai', 19.0760, 72.8777, 0.10, 5),
+    ('Bengaluru', 12.9716, 77.5946, 0.10, 5),
+    ('Delhi', 28.6139, 77.2090, 0.12, 5),
+    ('Hyderabad', 17.3850, 78.4867, 0.09, 3),
+    ('Chennai', 13.0827, 80.2707, 0.08, 3)
+]
+# (connector, power options in kW, supported vehicle types, weight)
+SYNTHETIC_CONNECTORS = [
+    ('Type 2', [3.3, 7.2, 11, 22], ['2W', '4W'], 5),
+    ('CCS2', [25, 30, 50, 60], ['4W'], 3),
+    ('16A 3-Pin Socket', [3.3], ['2W', '4W'], 3),
+    ('GB/T', [15], ['4W'], 1)
+]
+SYNTHETIC_STATUSES = ['AVAILABLE', 'BUSY', 'OFFLINE']
+SYNTHETIC_STATUS_WEIGHTS = [7, 2, 1]
+SYNTHETIC_PASSWORD = 'Password123!'
+# Hourly slots as the booking screen formats them; evenings are busiest.
+SYNTHETIC_SLOTS = [f'{hour % 12 or 12}:00 {"AM" if hour < 12 else "PM"}' for hour in range(6, 23)]
+SYNTHETIC_SLOT_WEIGHTS = [1, 2, 3, 3, 2, 2, 2, 2, 2, 2, 3, 4, 5, 5, 4, 3, 2]
+SYNTHETIC_REVIEWS = [
+    'Quick and easy, host was helpful.',
+    'Charger worked fine, parking was a bit tight.',
+    'Great spot, will come back.',
+    'Took a while to find the entrance.',
+    'Fast charging and clean surroundings.',
+    'Socket was loose but it worked.'
+]
+
+
+@dataclass
+class SyntheticDataset:
+    host_emails: list[str] = field(default_factory=list)
+    driver_emails: list[str] = field(default_factory=list)
+    station_ids: list[str] = field(default_factory=list)
+    password: str = SYNTHETIC_PASSWORD
+    counts: dict[str, int] = field(default_factory=dict)
+
+
+def _uuid(rng: random.Random) -> str:
+    # Formatting the bits directly is several times cheaper than building uuid.UUID objects.
+    digits = '%032x' % rng.getrandbits(128)
+    return f'{digits[:8]}-{digits[8:12]}-4{digits[13:16]}-{digits[16:20]}-{digits[20:]}'
+
+
+def _weighted_picker(rng: random.Random, population: list, weights: list[int]):
+    cumulative = list(accumulate(weights))
+    total = cumulative[-1]
+    return lambda: population[bisect(cumulative, rng.random() * total)]
+
+
+def _chunks(rows: Iterator[dict], chunk_size: int) -> Iterator[list[dict]]:
+    chunk: list[dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _bulk_insert(engine: Engine, table, rows: Iterator[dict], chunk_size: int) -> int:
+    # Rows are produced lazily, so memory stays at one chunk however many are loaded.
+    inserted = 0
+    for chunk in _chunks(rows, chunk_size):
+        with engine.begin() as conn:
+            conn.execute(insert(table), chunk)
+        inserted += len(chunk)
+    return inserted
+
+
+def seed_synthetic_data(
+    engine: Engine,
+    hosts: int,
+    drivers: int,
+    stations: int,
+    bookings: int,
+    seed: int = 42,
+    prefix: str = 'synthetic',
+    days: int = 180,
+    chunk_size: int = 10000,
+    password: str = SYNTHETIC_PASSWORD
+) -> SyntheticDataset:
+    """Generate and bulk insert a deterministic dataset for ``seed``.
+
+    Emails and usernames start with ``prefix``; use a new one to add a
+    second dataset to the same database.
+    """
+    if hosts < 1 or (bookings and (drivers < 1 or stations < 1)):
+        raise ValueError('Need at least one host, and one driver and one station when generating bookings.')
+
+    # The prefix is part of the seed so a second dataset gets its own ids.
+    rng = random.Random(f'{seed}:{prefix}')
+    password_hash = hash_password(password)
+    now = datetime.utcnow()
+    dataset = SyntheticDataset(password=password)
+
+    def user_row(role: str, index: int, phone_prefix: str) -> dict:
+        email = f'{prefix}.{role}{index}@example.com'
+        (dataset.host_emails if role == 'host' else dataset.driver_emails).append(email)
+        return {
+            'id': _uuid(rng),
+            'username': f'{prefix}_{role}{index}',
+            'email': email,
+            'password_hash': password_hash,
+            'phone_number': f'{phone_prefix}{index:08d}',
+            'role': role,
+            'permissions': [],
+            'email_verified': True,
+            'driver_profile_complete': role == 'driver',
+            'host_profile_complete': role == 'host',
+            'created_at': now,
+            'updated_at': now
+        }
+
+    # Hosts and drivers stay in memory as (id, username, phone) so stations and bookings can refer to them.
+    host_refs: list[tuple[str, str, str]] = []
+    driver_refs: list[tuple[str, str, str]] = []
+
+    def users(role: str, count: int, phone_prefix: str, refs: list) -> Iterator[dict]:
+        for index in range(count):
+            row = user_row(role, index, phone_prefix)
+            refs.append((row['id'], row['username'], row['phone_number']))
+            yield row
+
+    dataset.counts['hosts'] = _bulk_insert(engine, User.__table__, users('host', hosts, '+9198', host_refs), chunk_size)
+    dataset.counts['drivers'] = _bulk_insert(
+        engine, User.__table__, users('driver', drivers, '+9197', driver_refs), chunk_size
+    )
+    _bulk_insert(engine, HostProfile.__table__, (
+        {
+            'id': _uuid(rng),
+            'user_id': host_id,
+            'parking_type': rng.choice(['Driveway', 'Basement', 'Open Lot', 'Street']),
+            'parking_address': None,
+            'created_at': now,
+            'updated_at': now
+        }
+        for host_id, _, _ in host_refs
+    ), chunk_size)
+    _bulk_insert(engine, DriverProfile.__table__, (
+        {
+            'id': _uuid(rng),
+            'user_id': driver_id,
+            'vehicle_type': rng.choice(['2W', '4W']),
+            'vehicle_model': rng.choice(['Nexon EV', 'MG ZS EV', 'Ather 450X', 'Ola S1 Pro', 'Kona Electric']),
+            'vehicle_number': None,
+            'created_at': now,
+            'updated_at': now
+        }
+        for driver_id, _, _ in driver_refs
+    ), chunk_size)
+
+    pick_city = _weighted_picker(rng, SYNTHETIC_CITIES, [city[4] for city in SYNTHETIC_CITIES])
+    pick_connector = _weighted_picker(rng, SYNTHETIC_CONNECTORS, [connector[3] for connector in SYNTHETIC_CONNECTORS])
+    pick_status = _weighted_picker(rng, SYNTHETIC_STATUSES, SYNTHETIC_STATUS_WEIGHTS)
+    pick_slot = _weighted_picker(rng, SYNTHETIC_SLOTS, SYNTHETIC_SLOT_WEIGHTS)
+    pick_rating = _weighted_picker(rng, [1, 2, 3, 4, 5], [1, 1, 3, 8, 10])
+
+    def station_rows() -> Iterator[dict]:
+        for index in range(stations):
+            host_id, host_name, host_phone = host_refs[index % len(host_refs)]
+            city, lat, lng, spread, _ = pick_city()
+            connector, powers, vehicle_types, _ = pick_connector()
+            power_kw = rng.choice(powers)
+            station_id = _uuid(rng)
+            dataset.station_ids.append(station_id)
+            yield {
+                'id': station_id,
+                'host_id': host_id,
+                'host_name': host_name,
+                'title': f'{city} Charge Point {index}',
+                'location': f'Sector {rng.randint(1, 60)}, {city}',
+                'rating': 0.0,
+                'review_count': 0,
+                # Faster chargers cost more per hour.
+                'price_per_hour': int(round(60 + power_kw * 4 + rng.randint(0, 8) * 10, -1)),
+                'status': pick_status(),
+                'image': f'https://picsum.photos/400/300?random={index}',
+                'connector_type': connector,
+                'power_output': f'{power_kw:g}kW',
+                'description': f'{connector} charger in {city}.',
+                'lat': rng.gauss(lat, spread),
+                'lng': rng.gauss(lng, spread),
+                'phone_number': host_phone,
+                'supported_vehicle_types': vehicle_types,
+                'monthly_earnings': 0,
+                'created_at': now,
+                'updated_at': now
+            }
+
+    dataset.counts['stations'] = _bulk_insert(engine, Station.__table__, station_rows(), chunk_size)
+
+    station_hosts = dict(zip(dataset.station_ids, (host_refs[index % len(host_refs)][0] for index in range(stations))))
+    active_slots: set[tuple[str, str]] = set()
+    minutes = days * 24 * 60
+
+    def booking_rows() -> Iterator[dict]:
+        for _ in range(bookings):
+            station_id = dataset.station_ids[rng.randrange(stations)]
+            driver_id, driver_name, driver_phone = driver_refs[rng.randrange(len(driver_refs))]
+            slot = pick_slot()
+            roll = rng.random()
+            booking_status = 'COMPLETED' if roll < 0.9 else 'CANCELLED' if roll < 0.97 else 'ACTIVE'
+            # Only one active booking may hold a station's slot, as the booking route enforces.
+            if booking_status == 'ACTIVE':
+                if (station_id, slot) in active_slots:
+                    booking_status = 'COMPLETED'
+                else:
+                    active_slots.add((station_id, slot))
+            rated = booking_status == 'COMPLETED' and rng.random() < 0.6
+            created_at = now - timedelta(minutes=rng.randrange(minutes)) if booking_status != 'ACTIVE' else now
+            yield {
+                'id': _uuid(rng),
+                'station_id': station_id,
+                'host_id': station_hosts[station_id],
+                'driver_id': driver_id,
+                'driver_name': driver_name,
+                'driver_phone_number': driver_phone,
+                'status': booking_status,
+                'start_time': slot,
+                'rating': pick_rating() if rated else None,
+                'review': rng.choice(SYNTHETIC_REVIEWS) if rated and rng.random() < 0.4 else None,
+                'created_at': created_at,
+                'updated_at': created_at
+            }
+
+    dataset.counts['bookings'] = _bulk_insert(engine, Booking.__table__, booking_rows(), chunk_size)
+
+    if bookings:
+        rated = (
+            select(func.count(Booking.id))
+            .where(Booking.station_id == Station.id, Booking.status == 'COMPLETED', Booking.rating.is_not(None))
+            .scalar_subquery()
+        )
+        average = (
+            select(func.coalesce(func.round(func.avg(Booking.rating), 1), 0.0))
+            .where(Booking.station_id == Station.id, Booking.status == 'COMPLETED', Booking.rating.is_not(None))
+            .scalar_subquery()
+        )
+        with engine.begin() as conn:
+            conn.execute(
+                update(Station)
+                .where(Station.host_name.startswith(f'{prefix}_host', autoescape=True))
+                .values(review_count=rated, rating=average)
+            )
+    return dataset
+
+
+def main() -> None:
+    from app.db.session import engine, init_db
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hosts', type=int, default=100)
+    parser.add_argument('--drivers', type=int, default=1000)
+    parser.add_argument('--stations', type=int, default=2000)
+    parser.add_argument('--bookings', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--prefix', default='synthetic', help='email/username prefix for the generated users')
+    parser.add_argument('--days', type=int, default=180, help='spread historical bookings over this many days')
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    init_db()
+    started = time.perf_counter()
+    try:
+        dataset = seed_synthetic_data(
+            engine,
+            hosts=args.hosts,
+            drivers=args.drivers,
+            stations=args.stations,
+            bookings=args.bookings,
+            seed=args.seed,
+            prefix=args.prefix,
+            days=args.days,
+            chunk_size=args.chunk_size
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+    print(json.dumps({
+        **dataset.counts,
+        'seconds': round(time.perf_counter() - started, 2),
+        'password': dataset.password
+    }))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,28 +1,72 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import get_settings
 
 settings = get_settings()
 
-connect_args = {}
-if settings.database_url.startswith('sqlite'):
-    connect_args = {'check_same_thread': False}
 
-engine = create_engine(settings.database_url, connect_args=connect_args)
+def _apply_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers proceed while a writer holds the database; NORMAL sync is
+    # durable across application crashes in WAL mode and skips most fsyncs.
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute(f'PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}')
+    cursor.execute(f'PRAGMA mmap_size={int(settings.sqlite_mmap_size_bytes)}')
+    # A negative cache_size is in KiB rather than pages.
+    cursor.execute(f'PRAGMA cache_size=-{int(settings.sqlite_cache_size_kib)}')
+    cursor.close()
+
+
+def create_db_engine(database_url: str, sqlite_pragmas: bool | None = None) -> Engine:
+    is_sqlite = database_url.startswith('sqlite')
+    in_memory = is_sqlite and (':memory:' in database_url or database_url.rstrip('/') in {'sqlite:', 'sqlite+pysqlite:'})
+
+    options = {
+        'pool_pre_ping': settings.db_pool_pre_ping,
+        'pool_recycle': settings.db_pool_recycle_seconds
+    }
+    if is_sqlite:
+        options['connect_args'] = {'check_same_thread': False}
+    if not in_memory:
+        # In-memory SQLite uses a single-connection pool that takes no sizing options.
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds
+        )
+
+    engine = create_engine(database_url, **options)
+    if is_sqlite and not in_memory and (settings.sqlite_pragmas if sqlite_pragmas is None else sqlite_pragmas):
+        event.listen(engine, 'connect', _apply_sqlite_pragmas)
+    return engine
+
+
+engine = create_db_engine(settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read-only routes use this factory; without a replica it shares the primary engine.
+read_engine = create_db_engine(settings.database_read_url) if settings.database_read_url else engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+
+@event.listens_for(SessionLocal, 'after_commit')
+def _record_commit(session) -> None:
+    # get_db uses this to pin the committing user's reads to the primary for a while.
+    session.info['committed'] = True
+
 
 def init_db() -> None:
-    from app.db.base import Base
-    from app.db.models import (
-        user,
-        session,
-        email_verification,
-        password_reset,
-        station,
-        booking,
-        driver_profile,
-        host_profile
-    )
-
-    Base.metadata.create_all(bind=engine)
+    # Worker boot only checks schema_version; DDL runs when a migration is pending.
+    from app.db.migrations import LATEST_VERSION, current_version, migrate
+
+    if settings.db_migrate_on_startup:
+        migrate(engine)
+        return
+    version = current_version(engine)
+    if version < LATEST_VERSION:
+        raise RuntimeError(
+            f'Database schema is at version {version}, expected {LATEST_VERSION}; '
+            'run `python -m app.db.migrations`.'
+        )
@@ -1,17 +1,28 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import anyio
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import auth, users, host, driver, profile
+from app.api.routes import auth, users, host, driver, profile, admin
 from app.core.config import get_settings
 from app.core.exceptions import (
     http_exception_handler,
     internal_exception_handler,
     validation_exception_handler
 )
-from app.db.session import init_db
+from app.core.mailer import run_outbox_worker, transport
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, registry, run_metrics_flush
+from app.core.password_pool import password_batch_hasher
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.revocation import revocation_list
+from app.db.maintenance import run_periodic_purge
+from app.db.seed import ensure_global_demo_stations
+from app.db.session import SessionLocal, init_db
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title=settings.app_name)
 
@@ -22,8 +33,13 @@ app.add_middleware(
     allow_origins=origins or ['*'],
     allow_credentials=True,
     allow_methods=['*'],
-    allow_headers=['*']
+    allow_headers=['*'],
+    expose_headers=['X-Next-Cursor'] + (
+        ['X-DB-Query-Count', 'X-DB-Query-Time-Ms'] if settings.query_stats_headers else []
+    )
 )
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
@@ -33,6 +49,52 @@ app.add_exception_handler(Exception, internal_exception_handler)
 @app.on_event('startup')
 def on_startup() -> None:
     init_db()
+    db = SessionLocal()
+    try:
+        # Seeded here rather than on first search so read routes never write.
+        ensure_global_demo_stations(db)
+        if settings.auth_stateless:
+            revocation_list.sync(db, force=True)
+    finally:
+        db.close()
+
+
+@app.on_event('startup')
+async def configure_threadpool() -> None:
+    # A request holds its pooled connection across several thread hops (auth
+    # dependency, profile gate, route body), so worker threads must outnumber
+    # connections: threads blocked waiting for a connection would otherwise hold
+    # every token while the sessions that own the connections wait for one.
+    if not settings.threadpool_tokens:
+        return
+    connections = settings.db_pool_size + settings.db_max_overflow
+    if settings.threadpool_tokens <= connections:
+        logger.warning(
+            'THREADPOOL_TOKENS=%s is not above DB_POOL_SIZE + DB_MAX_OVERFLOW (%s); requests can deadlock on the pool',
+            settings.threadpool_tokens,
+            connections
+        )
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_tokens
+
+
+@app.on_event('startup')
+async def start_background_tasks() -> None:
+    app.state.background_tasks = [asyncio.create_task(run_outbox_worker(settings.email_outbox_poll_seconds))]
+    if settings.maintenance_interval_seconds > 0:
+        app.state.background_tasks.append(
+            asyncio.create_task(run_periodic_purge(settings.maintenance_interval_seconds))
+        )
+    if settings.metrics_multiproc_dir:
+        app.state.background_tasks.append(asyncio.create_task(run_metrics_flush(settings.metrics_flush_seconds)))
+
+
+@app.on_event('shutdown')
+async def stop_background_tasks() -> None:
+    for task in getattr(app.state, 'background_tasks', []):
+        task.cancel()
+    password_batch_hasher.shutdown()
+    transport.close()
+    registry.flush()
 
 
 @app.get('/health')
@@ -40,8 +102,14 @@ def health_check() -> dict:
     return {'status': 'ok'}
 
 
+@app.get('/metrics', include_in_schema=False)
+def metrics() -> Response:
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(host.router)
 app.include_router(driver.router)
 app.include_router(profile.router)
+app.include_router(admin.router)
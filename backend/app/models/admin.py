@@ -0,0 +1,17 @@
+from typing import Dict, List
+from app.models.base import CamelModel
+
+
+class SlowQueryOut(CamelModel):
+    statement: str
+    count: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    routes: Dict[str, int]
+    plan: List[str]
+
+
+class SlowQueryList(CamelModel):
+    threshold_ms: float
+    data: List[SlowQueryOut]
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import Field
 from app.models.base import CamelModel
 
@@ -61,3 +61,16 @@ class StationReview(CamelModel):
     rating: int
     review: Optional[str] = None
     created_at: datetime
+
+
+class StationStreamViewport(CamelModel):
+    min_lat: float = Field(ge=-90, le=90)
+    min_lng: float = Field(ge=-180, le=180)
+    max_lat: float = Field(ge=-90, le=90)
+    max_lng: float = Field(ge=-180, le=180)
+
+
+class StationStreamSubscription(CamelModel):
+    action: Literal['subscribe', 'unsubscribe'] = 'subscribe'
+    station_ids: list[str] = Field(default_factory=list, max_length=500)
+    viewport: Optional[StationStreamViewport] = None
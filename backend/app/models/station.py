@@ -52,6 +52,18 @@ class StationUpdate(CamelModel):
     monthly_earnings: Optional[int] = Field(default=None, ge=0)
 
 
+class StationBulkUpdate(CamelModel):
+    station_ids: list[str] = Field(min_length=1, max_length=500)
+    status: Optional[StationStatus] = None
+    price_per_hour: Optional[int] = Field(default=None, ge=0)
+
+
+class StationBulkUpdateResult(CamelModel):
+    updated: list[str]
+    not_found: list[str]
+    cancelled_bookings: int
+
+
 class StationOut(CamelModel):
     id: str
     host_id: str
@@ -75,6 +87,20 @@ class StationOut(CamelModel):
     booked_time_slots: list[str] = Field(default_factory=list)
 
 
+class StationImportRow(CamelModel):
+    row: int
+    status: str  # created | invalid
+    id: Optional[str] = None
+    title: Optional[str] = None
+    message: Optional[str] = None
+
+
+class StationImportResponse(CamelModel):
+    created: int
+    skipped: int
+    results: list[StationImportRow]
+
+
 class HostStats(CamelModel):
     total_earnings: int
     active_bookings: int
@@ -57,3 +57,18 @@ class UserList(CamelModel):
     page: int
     limit: int
     total: int
+    next_cursor: Optional[str] = None
+
+
+class UserImportRow(CamelModel):
+    row: int
+    status: str  # created | duplicate | invalid | failed
+    id: Optional[str] = None
+    email: Optional[str] = None
+    message: Optional[str] = None
+
+
+class UserImportResponse(CamelModel):
+    created: int
+    skipped: int
+    results: List[UserImportRow]
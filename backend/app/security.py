@@ -5,6 +5,7 @@ import secrets
 import bcrypt
 from jose import jwt
 from app.core.config import get_settings
+from app.core.password_pool import password_batch_hasher, password_pool
 
 settings = get_settings()
 
@@ -16,15 +17,58 @@ def _normalize_password(password: str) -> bytes:
     return raw
 
 
-def hash_password(password: str) -> str:
-    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
+def hash_password(password: str, rounds: int | None = None) -> str:
+    salt = bcrypt.gensalt(rounds=rounds or settings.bcrypt_rounds)
     return bcrypt.hashpw(_normalize_password(password), salt).decode('utf-8')
 
 
+def hash_password_batch(passwords: list[str], rounds: int) -> list[str]:
+    # Runs inside bulk-hash worker processes; rounds is passed in so every worker
+    # uses the parent's cost even if its own environment differs.
+    return [hash_password(password, rounds) for password in passwords]
+
+
 def verify_password(password: str, password_hash: str) -> bool:
     return bcrypt.checkpw(_normalize_password(password), password_hash.encode('utf-8'))
 
 
+def password_hash_rounds(password_hash: str) -> int | None:
+    # bcrypt hashes look like $2b$12$<salt><digest>; the third field is the cost.
+    parts = password_hash.split('$')
+    if len(parts) != 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def password_needs_rehash(password_hash: str) -> bool:
+    return password_hash_rounds(password_hash) != settings.bcrypt_rounds
+
+
+def verify_password_and_rehash(password: str, password_hash: str) -> tuple[bool, str | None]:
+    """Verify ``password`` and return a new hash when the stored one uses a different cost."""
+    if not verify_password(password, password_hash):
+        return False, None
+    if password_needs_rehash(password_hash):
+        return True, hash_password(password)
+    return True, None
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run(hash_password, password)
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    return await password_pool.run(verify_password, password, password_hash)
+
+
+async def hash_passwords_parallel(passwords: list[str]) -> list[str]:
+    return await password_batch_hasher.map_chunks(hash_password_batch, passwords, settings.bcrypt_rounds)
+
+
+async def verify_password_and_rehash_async(password: str, password_hash: str) -> tuple[bool, str | None]:
+    return await password_pool.run(verify_password_and_rehash, password, password_hash)
+
+
 def create_access_token(data: dict[str, Any], expires_minutes: int | None = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=expires_minutes or settings.access_token_expire_minutes)
@@ -0,0 +1,50 @@
+import atexit
+import logging
+import os
+import statistics
+import tempfile
+
+
+def configure_environment(database_url: str | None = None, **overrides: str) -> str:
+    """Point the app at a throwaway database before anything imports ``app``."""
+    if database_url is None:
+        handle, path = tempfile.mkstemp(prefix='snapcharge-bench-', suffix='.db')
+        os.close(handle)
+        atexit.register(_remove_database_files, path)
+        database_url = f'sqlite:///{path}'
+
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-secret-key-1234567890123456789')
+    os.environ.setdefault('JWT_REFRESH_SECRET_KEY', 'benchmark-refresh-secret-key-1234567890123')
+    os.environ.setdefault('SEED_DEMO_DATA', 'false')
+    for key, value in overrides.items():
+        os.environ[key.upper()] = str(value)
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    return database_url
+
+
+def _remove_database_files(path: str) -> None:
+    for candidate in (path, f'{path}-wal', f'{path}-shm'):
+        try:
+            os.remove(candidate)
+        except FileNotFoundError:
+            pass
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples_ms: list[float]) -> dict:
+    return {
+        'count': len(samples_ms),
+        'mean_ms': round(statistics.fmean(samples_ms), 3) if samples_ms else 0.0,
+        'p50_ms': round(percentile(samples_ms, 50), 3),
+        'p95_ms': round(percentile(samples_ms, 95), 3),
+        'p99_ms': round(percentile(samples_ms, 99), 3),
+        'max_ms': round(max(samples_ms), 3) if samples_ms else 0.0
+    }
@@ -0,0 +1,124 @@
+"""
+Concurrent reads and writes against SQLite with and without the connection pragmas.
+
+    python -m benchmarks.db_concurrency --seconds 5 --readers 8 --writers 2
+
+Readers look users up by primary key while writers insert users in short
+transactions. Without WAL every commit takes an exclusive lock that stalls
+readers; with it readers keep going and only writers serialize.
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from benchmarks.common import configure_environment, summarize
+
+
+def run_mode(sqlite_pragmas: bool, args: argparse.Namespace) -> dict:
+    from sqlalchemy.orm import sessionmaker
+    from app.db.base import Base
+    from app.db.models.user import User
+    from app.db.session import create_db_engine
+    import app.db.models  # noqa: F401  register every table on Base.metadata
+
+    handle, path = tempfile.mkstemp(prefix='snapcharge-dbbench-', suffix='.db')
+    os.close(handle)
+    engine = create_db_engine(f'sqlite:///{path}', sqlite_pragmas=sqlite_pragmas)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+
+    with SessionLocal() as db:
+        ids = []
+        for index in range(args.seed_users):
+            user = User(
+                username=f'bench{index}',
+                email=f'bench{index}@example.com',
+                password_hash='x',
+                phone_number='+919800000000'
+            )
+            db.add(user)
+            db.flush()
+            ids.append(user.id)
+        db.commit()
+
+    read_ms: list[float] = []
+    write_ms: list[float] = []
+    errors = {'read': 0, 'write': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def reader(offset: int) -> None:
+        position = offset
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                with SessionLocal() as db:
+                    db.get(User, ids[position % len(ids)])
+            except Exception:
+                with lock:
+                    errors['read'] += 1
+                continue
+            with lock:
+                read_ms.append((time.perf_counter() - started) * 1000)
+            position += 1
+
+    def writer() -> None:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            name = uuid.uuid4().hex[:16]
+            try:
+                with SessionLocal() as db:
+                    db.add(User(username=name, email=f'{name}@example.com', password_hash='x'))
+                    db.flush()
+                    time.sleep(args.write_hold_ms / 1000)
+                    db.commit()
+            except Exception:
+                with lock:
+                    errors['write'] += 1
+                continue
+            with lock:
+                write_ms.append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=reader, args=(index * 97,)) for index in range(args.readers)]
+    threads += [threading.Thread(target=writer) for _ in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    engine.dispose()
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    return {
+        'reads_per_second': round(len(read_ms) / args.seconds),
+        'writes_per_second': round(len(write_ms) / args.seconds),
+        'errors': errors,
+        'read_latency': summarize(read_ms),
+        'write_latency': summarize(write_ms)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--write-hold-ms', type=float, default=2.0)
+    parser.add_argument('--seed-users', type=int, default=1000)
+    args = parser.parse_args()
+
+    configure_environment(DB_POOL_SIZE=args.readers + args.writers, DB_MAX_OVERFLOW=0)
+    results = {
+        'default_journal': run_mode(False, args),
+        'wal_pragmas': run_mode(True, args)
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Cold-start import cost of the app, with a budget check.
+
+    python -m benchmarks.import_time --runs 3 --budget-ms 1500
+
+Runs ``python -X importtime -c "import app.main"`` in fresh interpreters and
+reports the best total plus the slowest modules. Exits non-zero when the
+total is over ``--budget-ms`` or when a module that should load lazily (the
+Gemini, AWS and imaging SDKs) is imported at startup.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from benchmarks.common import configure_environment
+
+LAZY_MODULES = ('google.generativeai', 'boto3', 'botocore', 'PIL')
+
+
+def measure_once(target: str) -> dict[str, tuple[int, int]]:
+    """Module name -> (self us, cumulative us) for one cold import."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+        check=True
+    )
+    modules: dict[str, tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', default='app.main')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--budget-ms', type=float, default=1500.0)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    configure_environment()
+    runs = [measure_once(args.target) for _ in range(args.runs)]
+    best = min(runs, key=lambda modules: modules[args.target][1])
+    total_ms = best[args.target][1] / 1000
+    eager = sorted(name for name in best if any(name == lazy or name.startswith(f'{lazy}.') for lazy in LAZY_MODULES))
+    slowest = sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+
+    print(json.dumps({
+        'target': args.target,
+        'total_ms': round(total_ms, 1),
+        'budget_ms': args.budget_ms,
+        'eager_lazy_modules': eager,
+        'slowest_self_ms': {name: round(self_us / 1000, 1) for name, (self_us, _) in slowest}
+    }, indent=2))
+    if total_ms > args.budget_ms or eager:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Measure latency of unrelated endpoints while a burst of logins is in flight.
+
+    python -m benchmarks.login_storm --logins 200 --rounds 12
+    python -m benchmarks.login_storm --logins 200 --rounds 12 --inline
+
+``--inline`` swaps the bounded hashing pool for a direct bcrypt call on the
+event loop, reproducing the behaviour before hashing was moved off-loop.
+"""
+import argparse
+import asyncio
+import json
+import time
+from benchmarks.common import configure_environment, summarize
+
+
+async def run(args: argparse.Namespace) -> dict:
+    import httpx
+    from app.main import app
+    from app.api.routes import auth
+    from app.db.models.user import User
+    from app.db.session import SessionLocal, init_db
+    from app.security import hash_password, verify_password_and_rehash
+
+    init_db()
+    if args.inline:
+        async def verify_inline(password: str, password_hash: str) -> tuple[bool, str | None]:
+            return verify_password_and_rehash(password, password_hash)
+
+        auth.verify_password_and_rehash_async = verify_inline
+
+    db = SessionLocal()
+    password_hash = hash_password('Password123!')
+    emails = [f'storm{index}@example.com' for index in range(args.users)]
+    db.add_all([
+        User(
+            username=f'storm{index}',
+            email=email,
+            password_hash=password_hash,
+            phone_number='+919800000000',
+            role='member',
+            permissions=[]
+        )
+        for index, email in enumerate(emails)
+    ])
+    db.commit()
+    db.close()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        probe_latencies: list[float] = []
+        login_statuses: dict[int, int] = {}
+        storm_done = asyncio.Event()
+
+        async def probe() -> None:
+            # Latency is measured from when each probe was *due*, so time the
+            # loop spends blocked before the probe even starts is counted.
+            interval = args.probe_interval_ms / 1000
+            due = time.perf_counter()
+            while not storm_done.is_set():
+                await client.get('/api/driver/config')
+                probe_latencies.append((time.perf_counter() - due) * 1000)
+                due = max(due + interval, time.perf_counter())
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+
+        in_flight = asyncio.Semaphore(args.concurrency)
+
+        async def login(index: int) -> None:
+            async with in_flight:
+                response = await client.post('/api/auth/login', json={
+                    'email': emails[index % len(emails)],
+                    'password': 'Password123!'
+                })
+            login_statuses[response.status_code] = login_statuses.get(response.status_code, 0) + 1
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login(index) for index in range(args.logins)))
+        elapsed = time.perf_counter() - started
+        storm_done.set()
+        await probe_task
+
+    return {
+        'mode': 'inline' if args.inline else 'pool',
+        'bcrypt_rounds': args.rounds,
+        'logins': args.logins,
+        'concurrency': args.concurrency,
+        'login_statuses': login_statuses,
+        'storm_seconds': round(elapsed, 3),
+        'probe': summarize(probe_latencies)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--probe-interval-ms', type=float, default=5.0)
+    parser.add_argument('--inline', action='store_true')
+    args = parser.parse_args()
+
+    configure_environment(
+        BCRYPT_ROUNDS=args.rounds,
+        PASSWORD_HASH_QUEUE_MAX=args.logins,
+        RATE_LIMIT_LOGIN_MAX=args.logins + 1
+    )
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Measure rate limiter decisions per second for each backend.
+
+    python -m benchmarks.rate_limit --decisions 200000 --keys 10000
+
+Keys are drawn round-robin from ``--keys`` distinct clients; the memory
+result also reports how many entries are held (one fixed-size entry per key).
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from benchmarks.common import configure_environment
+
+
+def measure(backend, args: argparse.Namespace) -> dict:
+    from app.core.rate_limit import RateLimiter
+
+    limiter = RateLimiter(backend)
+    keys = [f'10.0.{index // 256}.{index % 256}:/api/auth/login' for index in range(args.keys)]
+    allowed = 0
+    started = time.perf_counter()
+    for index in range(args.decisions):
+        if limiter.is_allowed(keys[index % args.keys], args.limit, args.window_seconds):
+            allowed += 1
+    elapsed = time.perf_counter() - started
+    return {
+        'decisions': args.decisions,
+        'allowed': allowed,
+        'seconds': round(elapsed, 3),
+        'decisions_per_second': round(args.decisions / elapsed)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--decisions', type=int, default=200000)
+    parser.add_argument('--sqlite-decisions', type=int, default=20000)
+    parser.add_argument('--keys', type=int, default=10000)
+    parser.add_argument('--limit', type=int, default=8)
+    parser.add_argument('--window-seconds', type=int, default=900)
+    args = parser.parse_args()
+
+    configure_environment()
+    from app.core.rate_limit import MemoryBackend, SQLiteBackend
+
+    memory = MemoryBackend()
+    results = {'memory': {**measure(memory, args), 'entries': len(memory.storage)}}
+
+    handle, path = tempfile.mkstemp(prefix='snapcharge-ratelimit-', suffix='.db')
+    os.close(handle)
+    try:
+        args.decisions = args.sqlite_decisions
+        results['sqlite'] = measure(SQLiteBackend(path), args)
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+"""
+End-to-end API benchmark over a synthetic multi-city dataset.
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --baseline results.json --tolerance 0.15
+
+Loads ``app.db.seed.seed_synthetic_data`` into a throwaway SQLite database and drives the
+ASGI app in-process with httpx. Each scenario reports throughput, status
+counts and p50/p95/p99 latency:
+
+- search at several radii and with status, vehicle, tag and text filters
+- booking creation with many drivers racing for a few hot stations
+- login, host stats and driver booking history
+
+With ``--baseline`` every scenario is compared against a previous results
+file. A scenario regresses when its p95 rises, or its throughput falls, by
+more than ``--tolerance``. The exit code is non-zero when any scenario
+regresses.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+from benchmarks.common import configure_environment, summarize
+
+SEARCH_SCENARIOS = {
+    'search_radius_2km': {'radius_km': 2},
+    'search_radius_10km': {'radius_km': 10},
+    'search_radius_50km': {'radius_km': 50},
+    'search_available_4w': {'radius_km': 20, 'status': 'AVAILABLE', 'vehicle_type': '4W'},
+    'search_fast_charge_tag': {'radius_km': 20, 'tags': 'fast_charge'},
+    'search_text_query': {'radius_km': 20, 'q': 'charge point 1'}
+}
+
+
+async def run_scenario(make_request, requests: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    in_flight = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> None:
+        async with in_flight:
+            started = time.perf_counter()
+            response = await make_request(index)
+            latencies.append((time.perf_counter() - started) * 1000)
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'throughput_rps': round(requests / elapsed, 1) if elapsed else 0.0,
+        'statuses': statuses,
+        'latency': summarize(latencies)
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from app.main import app
+
+    # ASGITransport sends no lifespan events, so run the real startup hooks
+    # (migrations, thread pool sizing, background tasks) here; otherwise the
+    # suite measures a different configuration from production.
+    await app.router.startup()
+    try:
+        return await run_scenarios(args, app)
+    finally:
+        await app.router.shutdown()
+
+
+async def run_scenarios(args: argparse.Namespace, app) -> dict:
+    import httpx
+    from app.db.session import engine
+    from app.db.seed import SYNTHETIC_CITIES, SYNTHETIC_SLOTS, seed_synthetic_data
+
+    started = time.perf_counter()
+    dataset = seed_synthetic_data(
+        engine,
+        hosts=args.hosts,
+        drivers=args.drivers,
+        stations=args.stations,
+        bookings=args.bookings,
+        seed=args.seed,
+        prefix='bench'
+    )
+    load_seconds = time.perf_counter() - started
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        async def token_for(email: str) -> dict:
+            response = await client.post('/api/auth/login', json={'email': email, 'password': dataset.password})
+            response.raise_for_status()
+            return {'Authorization': f"Bearer {response.json()['tokens']['accessToken']}"}
+
+        driver_headers = [await token_for(email) for email in dataset.driver_emails[:args.sessions]]
+        host_headers = [await token_for(email) for email in dataset.host_emails[:args.sessions]]
+        scenarios: dict[str, dict] = {}
+
+        for name, params in SEARCH_SCENARIOS.items():
+            def search(index: int, params=params):
+                _, lat, lng, _, _ = SYNTHETIC_CITIES[index % len(SYNTHETIC_CITIES)]
+                return client.get('/api/driver/search', params={'lat': lat, 'lng': lng, **params})
+            scenarios[name] = await run_scenario(search, args.requests, args.concurrency)
+
+        # Many drivers, few stations and slots: most attempts hit the slot-conflict path.
+        hot_stations = dataset.station_ids[:args.hot_stations]
+
+        def book(index: int):
+            return client.post('/api/driver/bookings', headers=driver_headers[index % len(driver_headers)], json={
+                'stationId': hot_stations[index % len(hot_stations)],
+                'startTime': SYNTHETIC_SLOTS[(index // len(hot_stations)) % args.hot_slots]
+            })
+        scenarios['booking_contention'] = await run_scenario(book, args.requests, args.concurrency)
+
+        def login(index: int):
+            return client.post('/api/auth/login', json={
+                'email': dataset.driver_emails[index % len(dataset.driver_emails)],
+                'password': dataset.password
+            })
+        scenarios['login'] = await run_scenario(login, args.login_requests, args.concurrency)
+
+        def host_stats(index: int):
+            return client.get('/api/host/stats', headers=host_headers[index % len(host_headers)])
+        scenarios['host_stats'] = await run_scenario(host_stats, args.requests, args.concurrency)
+
+        def booking_history(index: int):
+            return client.get('/api/driver/bookings', headers=driver_headers[index % len(driver_headers)])
+        scenarios['booking_history'] = await run_scenario(booking_history, args.requests, args.concurrency)
+
+    return {
+        'environment': {'python': platform.python_version(), 'platform': platform.platform()},
+        'dataset': {
+            'hosts': args.hosts,
+            'drivers': args.drivers,
+            'stations': args.stations,
+            'bookings': args.bookings,
+            'seed': args.seed,
+            'load_seconds': round(load_seconds, 2)
+        },
+        'scenarios': scenarios
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> dict:
+    comparison: dict[str, dict] = {}
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        p95_change = (current['latency']['p95_ms'] - previous['latency']['p95_ms']) / (previous['latency']['p95_ms'] or 1)
+        throughput_change = (
+            (current['throughput_rps'] - previous['throughput_rps']) / (previous['throughput_rps'] or 1)
+        )
+        comparison[name] = {
+            'p95_change': round(p95_change, 3),
+            'throughput_change': round(throughput_change, 3),
+            'regressed': p95_change > tolerance or throughput_change < -tolerance
+        }
+    return comparison
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hosts', type=int, default=50)
+    parser.add_argument('--drivers', type=int, default=500)
+    parser.add_argument('--stations', type=int, default=2000)
+    parser.add_argument('--bookings', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--login-requests', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--sessions', type=int, default=20, help='drivers and hosts logged in up front')
+    parser.add_argument('--hot-stations', type=int, default=5)
+    parser.add_argument('--hot-slots', type=int, default=3)
+    parser.add_argument('--bcrypt-rounds', type=int, default=10)
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--baseline', help='results JSON from an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    configure_environment(
+        BCRYPT_ROUNDS=args.bcrypt_rounds,
+        PASSWORD_HASH_QUEUE_MAX=max(64, args.concurrency * 2),
+        RATE_LIMIT_LOGIN_MAX=args.login_requests + 2 * args.sessions + 1,
+        MAINTENANCE_INTERVAL_SECONDS=0
+    )
+    results = asyncio.run(run(args))
+
+    regressed = False
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as handle:
+            results['comparison'] = compare(results, json.load(handle), args.tolerance)
+        regressed = any(item['regressed'] for item in results['comparison'].values())
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            handle.write(output + '\n')
+    print(output)
+    if regressed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
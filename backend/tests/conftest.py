@@ -13,9 +13,15 @@ os.environ.setdefault('RATE_LIMIT_LOGIN_MAX', '100')
 os.environ.setdefault('RATE_LIMIT_REGISTER_MAX', '100')
 os.environ.setdefault('RATE_LIMIT_RESET_MAX', '100')
 os.environ.setdefault('SEED_DEMO_DATA', 'false')
+os.environ.setdefault('QUERY_STATS_HEADERS', 'true')
 
 from app.main import app
+from app.api.utils.users import user_total
+from app.core.auth_cache import principal_cache
 from app.core.mailer import clear_email_log
+from app.core.read_routing import recent_writers
+from app.core.revocation import revocation_list
+from app.core.slow_queries import slow_query_log
 from app.db.base import Base
 from app.db.session import engine
 from app.core.rate_limit import limiter
@@ -27,10 +33,22 @@ def setup_database():
     Base.metadata.create_all(bind=engine)
     yield
     clear_email_log()
-    limiter.storage.clear()
+    principal_cache.clear()
+    revocation_list.clear()
+    limiter.reset()
+    recent_writers.clear()
+    slow_query_log.clear()
+    user_total.invalidate()
     Base.metadata.drop_all(bind=engine)
 
 
 @pytest.fixture()
 def client():
     return TestClient(app)
+
+
+@pytest.fixture()
+def query_count():
+    def count(response) -> int:
+        return int(response.headers['X-DB-Query-Count'])
+    return count
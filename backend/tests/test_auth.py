@@ -1,5 +1,6 @@
 from urllib.parse import urlparse, parse_qs
 from app.core.mailer import get_email_log
+from app.core.rate_limit import limiter
 
 
 def register_user(client, overrides=None):
@@ -63,6 +64,15 @@ def test_login_invalid_credentials(client):
     assert response.json()['error']['code'] == 'INVALID_CREDENTIALS'
 
 
+def test_login_is_rate_limited(client):
+    for _ in range(100):
+        limiter.is_allowed('testclient:/api/auth/login', limit=100, window_seconds=60)
+    response = login_user(client)
+    assert response.status_code == 429
+    assert response.json()['error']['code'] == 'RATE_LIMITED'
+    assert int(response.headers['Retry-After']) > 0
+
+
 def test_verify_email(client):
     register_user(client)
     emails = get_email_log()
@@ -94,6 +104,32 @@ def test_logout_revokes_session(client):
     assert refresh_response.status_code == 401
 
 
+def test_logout_rejects_cached_access_token(client):
+    register_response = register_user(client)
+    tokens = register_response.json()['tokens']
+    headers = {'Authorization': f"Bearer {tokens['accessToken']}"}
+
+    assert client.get('/api/auth/me', headers=headers).status_code == 200
+    assert client.get('/api/auth/me', headers=headers).status_code == 200
+
+    client.post('/api/auth/logout', json={'refreshToken': tokens['refreshToken']})
+    response = client.get('/api/auth/me', headers=headers)
+    assert response.status_code == 401
+
+
+def test_reset_password_rejects_cached_access_token(client):
+    register_response = register_user(client)
+    headers = {'Authorization': f"Bearer {register_response.json()['tokens']['accessToken']}"}
+    assert client.get('/api/auth/me', headers=headers).status_code == 200
+
+    client.post('/api/auth/forgot-password', json={'email': 'driver@example.com'})
+    reset_email = [email for email in get_email_log() if email['type'] == 'password_reset'][0]
+    token = parse_qs(urlparse(reset_email['meta']['link']).query)['token'][0]
+    client.post('/api/auth/reset-password', json={'token': token, 'password': 'NewPassword123!'})
+
+    assert client.get('/api/auth/me', headers=headers).status_code == 401
+
+
 def test_forgot_and_reset_password(client):
     register_user(client)
 
@@ -220,3 +256,193 @@ def test_update_me_no_fields(client):
     )
     assert response.status_code == 400
     assert response.json()['error']['code'] == 'VALIDATION_ERROR'
+
+
+def test_stateless_mode_honours_logout(client, monkeypatch):
+    from app.api import deps
+
+    monkeypatch.setattr(deps.settings, 'auth_stateless', True)
+    tokens = register_user(client).json()['tokens']
+    headers = {'Authorization': f"Bearer {tokens['accessToken']}"}
+    assert client.get('/api/auth/me', headers=headers).status_code == 200
+
+    client.post('/api/auth/logout', json={'refreshToken': tokens['refreshToken']})
+    assert client.get('/api/auth/me', headers=headers).status_code == 401
+
+
+def test_stateless_mode_picks_up_revocations_from_other_workers(client, monkeypatch):
+    from datetime import datetime
+    from app.api import deps
+    from app.core.auth_cache import principal_cache
+    from app.core.revocation import revocation_list
+    from app.db.models.session import Session as DbSession
+    from app.db.session import SessionLocal
+
+    monkeypatch.setattr(deps.settings, 'auth_stateless', True)
+    tokens = register_user(client).json()['tokens']
+    headers = {'Authorization': f"Bearer {tokens['accessToken']}"}
+    assert client.get('/api/auth/me', headers=headers).status_code == 200
+
+    # Another worker revokes the session directly in the shared sessions table.
+    db = SessionLocal()
+    db.query(DbSession).update({DbSession.revoked_at: datetime.utcnow()})
+    db.commit()
+    db.close()
+    principal_cache.clear()
+    revocation_list.next_sync = 0.0
+
+    assert client.get('/api/auth/me', headers=headers).status_code == 401
+
+
+def test_revocation_list_forgets_expired_entries_without_sync():
+    from datetime import datetime, timedelta
+    from app.core.revocation import revocation_list
+
+    revocation_list.revoke(['stale'], datetime.utcnow() - revocation_list.token_lifetime - timedelta(seconds=1))
+    revocation_list.revoke(['fresh'])
+    assert set(revocation_list.revoked) == {'fresh'}
+
+
+def test_purge_removes_expired_used_and_old_revoked_rows(client):
+    from datetime import datetime, timedelta
+    from app.db.maintenance import purge_auth_rows
+    from app.db.models.email_verification import EmailVerificationToken
+    from app.db.models.session import Session as DbSession
+    from app.db.session import SessionLocal
+
+    revoked = register_user(client).json()['tokens']
+    register_user(client, {'username': 'drivertwo', 'email': 'two@example.com'})
+    register_user(client, {'username': 'driverthree', 'email': 'three@example.com'})
+    client.post('/api/auth/logout', json={'refreshToken': revoked['refreshToken']})
+
+    db = SessionLocal()
+    now = datetime.utcnow()
+    sessions = db.query(DbSession).filter(DbSession.revoked_at.is_(None)).order_by(DbSession.created_at).all()
+    sessions[0].expires_at = now - timedelta(minutes=1)
+    db.query(EmailVerificationToken).filter(
+        EmailVerificationToken.user_id == sessions[1].user_id
+    ).update({EmailVerificationToken.used_at: now})
+    db.commit()
+
+    deleted = purge_auth_rows(db, batch_size=1, now=now)
+    assert deleted == {
+        'sessions': 1,
+        'email_verification_tokens': 1,
+        'password_reset_tokens': 0,
+        'email_outbox': 0
+    }
+    # The revoked session is kept until access tokens minted for it have expired.
+    assert db.query(DbSession).count() == 2
+
+    deleted = purge_auth_rows(db, batch_size=1, now=now + timedelta(days=2))
+    assert deleted['sessions'] == 1
+    assert db.query(DbSession).count() == 1
+    db.close()
+
+
+def test_login_rehashes_password_with_outdated_cost(client):
+    import bcrypt
+    from app.db.models.user import User
+    from app.db.session import SessionLocal
+    from app.security import password_hash_rounds
+
+    register_user(client)
+    db = SessionLocal()
+    user = db.query(User).filter(User.email == 'driver@example.com').first()
+    user.password_hash = bcrypt.hashpw(b'Password123!', bcrypt.gensalt(rounds=5)).decode('utf-8')
+    db.commit()
+
+    assert login_user(client).status_code == 200
+    db.refresh(user)
+    assert password_hash_rounds(user.password_hash) == 4
+    assert login_user(client).status_code == 200
+    db.close()
+
+
+def test_email_outbox_retries_failed_delivery(client, monkeypatch):
+    from app.core import mailer
+    from app.db.models.email_outbox import EmailOutbox
+    from app.db.session import SessionLocal
+
+    def fail(payload):
+        raise OSError('smtp unavailable')
+
+    monkeypatch.setattr(mailer.transport, 'send', fail)
+    assert register_user(client).status_code == 201
+    assert get_email_log() == []
+
+    db = SessionLocal()
+    message = db.query(EmailOutbox).one()
+    assert message.status == 'pending'
+    assert message.attempts == 1
+    assert message.last_error == 'smtp unavailable'
+
+    monkeypatch.undo()
+    message.next_attempt_at = message.created_at
+    db.commit()
+    assert mailer.drain_outbox() == 1
+    # A sent verification email takes its one-time link with it.
+    db.expire_all()
+    assert db.query(EmailOutbox).count() == 0
+    assert get_email_log()[0]['type'] == 'verification'
+    db.close()
+
+
+def test_email_outbox_drops_link_when_delivery_gives_up(client, monkeypatch):
+    from app.core import mailer
+    from app.db.models.email_outbox import EmailOutbox
+    from app.db.session import SessionLocal
+
+    def fail(payload):
+        raise OSError('smtp unavailable')
+
+    monkeypatch.setattr(mailer.transport, 'send', fail)
+    monkeypatch.setattr(mailer.settings, 'email_max_attempts', 1)
+    assert register_user(client).status_code == 201
+
+    db = SessionLocal()
+    message = db.query(EmailOutbox).one()
+    assert message.status == 'failed'
+    assert 'link' not in message.meta
+    assert message.meta['token_hash']
+    db.close()
+
+
+def test_email_outbox_claims_messages_before_sending(client, monkeypatch):
+    from app.core import mailer
+    from app.db.models.email_outbox import EmailOutbox
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    for index in range(2):
+        mailer.queue_email(db, {'to': f'user{index}@example.com', 'subject': 'Hi', 'type': 'test', 'meta': {}})
+    db.commit()
+
+    sent = []
+    concurrent = []
+    original_send = mailer.transport.send
+
+    def send(payload):
+        if not concurrent:
+            # Another worker draining mid-send must not pick up claimed messages.
+            other = SessionLocal()
+            concurrent.append(mailer.deliver_batch(other, 10))
+            other.close()
+        sent.append(payload['to'])
+        return original_send(payload)
+
+    monkeypatch.setattr(mailer.transport, 'send', send)
+    assert mailer.deliver_batch(db, 10) == 2
+    assert concurrent == [0]
+    assert sorted(sent) == ['user0@example.com', 'user1@example.com']
+    assert {message.status for message in db.query(EmailOutbox)} == {'sent'}
+    db.close()
+
+
+def test_memory_transport_keeps_a_bounded_log():
+    from app.core.mailer import MemoryTransport
+
+    transport = MemoryTransport(max_entries=2)
+    for index in range(3):
+        transport.send({'to': f'user{index}@example.com', 'subject': 'Hi', 'type': 'test', 'meta': {}})
+    assert [record['to'] for record in transport.log] == ['user1@example.com', 'user2@example.com']
@@ -1,4 +1,5 @@
 import json
+import os
 from starlette.requests import Request
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi.exceptions import RequestValidationError
@@ -7,7 +8,7 @@ from app.core.exceptions import (
     internal_exception_handler,
     validation_exception_handler
 )
-from app.core.rate_limit import limiter, rate_limit
+from app.core.rate_limit import MemoryBackend, SQLiteBackend, limiter, rate_limit
 
 
 def make_request():
@@ -57,6 +58,8 @@ def test_rate_limiter_blocks_requests():
 
 
 def test_rate_limit_dependency_raises():
+    import pytest
+
     dependency = rate_limit(limit=1, window_seconds=60)
     request = Request({
         'type': 'http',
@@ -68,8 +71,247 @@ def test_rate_limit_dependency_raises():
 
     assert limiter.is_allowed('127.0.0.1:/rate', limit=1, window_seconds=60) is True
     assert limiter.is_allowed('127.0.0.1:/rate', limit=1, window_seconds=60) is False
+    with pytest.raises(StarletteHTTPException) as exc_info:
+        dependency(request)
+    assert exc_info.value.status_code == 429
+
+
+def test_memory_backend_slides_window_and_evicts_idle_keys():
+    backend = MemoryBackend(sweep_interval_seconds=0)
+    assert backend.hit('ip:/login', limit=2, window_seconds=10, now=100.0) is True
+    assert backend.hit('ip:/login', limit=2, window_seconds=10, now=101.0) is True
+    assert backend.hit('ip:/login', limit=2, window_seconds=10, now=102.0) is False
+    # Halfway into the next window the previous two hits still weigh 1.0.
+    assert backend.hit('ip:/login', limit=2, window_seconds=10, now=115.0) is True
+    assert backend.hit('ip:/login', limit=2, window_seconds=10, now=115.0) is False
+
+    backend.hit('other', limit=2, window_seconds=10, now=200.0)
+    assert list(backend.storage) == ['other']
+
+
+def test_sqlite_backend_shares_counters_between_instances(tmp_path):
+    path = str(tmp_path / 'limits.db')
+    first = SQLiteBackend(path)
+    second = SQLiteBackend(path)
+    assert first.hit('ip:/login', limit=2, window_seconds=60, now=120.0) is True
+    assert second.hit('ip:/login', limit=2, window_seconds=60, now=121.0) is True
+    assert first.hit('ip:/login', limit=2, window_seconds=60, now=122.0) is False
+
+
+def test_station_event_hub_serializes_once_per_event():
+    import asyncio
+    from app.core.realtime import StationEventHub, Viewport
+
+    async def scenario():
+        hub = StationEventHub()
+        loop = asyncio.get_running_loop()
+        by_id = hub.connect(loop)
+        by_viewport = hub.connect(loop)
+        elsewhere = hub.connect(loop)
+        hub.subscribe(by_id, ['station-1'], None)
+        hub.subscribe(by_viewport, [], Viewport(18.0, 73.0, 19.0, 74.0))
+        hub.subscribe(elsewhere, ['station-2'], Viewport(28.0, 77.0, 29.0, 78.0))
+
+        delivered = hub.publish({'type': 'station.status', 'stationId': 'station-1', 'lat': 18.5, 'lng': 73.8})
+        await asyncio.sleep(0)
+
+        assert delivered == 2
+        assert by_id.queue.get_nowait() is by_viewport.queue.get_nowait()
+        assert elsewhere.queue.empty()
+
+        hub.disconnect(by_id)
+        hub.disconnect(by_viewport)
+        hub.disconnect(elsewhere)
+        assert hub.subscriber_count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_password_hash_pool_rejects_when_saturated():
+    import threading
+    from app.core.password_pool import PasswordHashPool
+
+    pool = PasswordHashPool(workers=1, queue_max=0)
+    release = threading.Event()
+    running = pool.submit(release.wait)
     try:
-        import asyncio
-        asyncio.run(dependency(request))
+        pool.submit(len, 'x')
     except Exception as exc:
-        assert getattr(exc, 'status_code', None) == 429
+        assert getattr(exc, 'status_code', None) == 503
+        assert exc.detail['code'] == 'SERVICE_BUSY'
+        assert exc.headers == {'Retry-After': '1'}
+    else:
+        raise AssertionError('expected the saturated pool to reject work')
+    finally:
+        release.set()
+    running.result(timeout=5)
+    assert pool.submit(len, 'x').result(timeout=5) == 1
+
+
+def test_principal_cache_evicts_lru_and_invalidates_by_user():
+    from datetime import datetime, timedelta
+    from app.core.auth_cache import CachedPrincipal, PrincipalCache
+
+    cache = PrincipalCache(max_entries=2, ttl_seconds=60)
+    expires = datetime.utcnow() + timedelta(days=1)
+    cache.put('s1', CachedPrincipal('u1', expires, {'id': 'u1'}))
+    cache.put('s2', CachedPrincipal('u1', expires, {'id': 'u1'}))
+    assert cache.get('s1') is not None
+    cache.put('s3', CachedPrincipal('u2', expires, {'id': 'u2'}))
+
+    assert cache.get('s2') is None
+    assert cache.get('s1').user_id == 'u1'
+
+    cache.invalidate_user('u1')
+    assert cache.get('s1') is None
+    assert cache.get('s3').user_id == 'u2'
+
+
+def test_concurrent_sqlite_migrations_apply_each_version_once(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from threading import Barrier
+    from sqlalchemy import create_engine
+    from app.db.migrations import LATEST_VERSION, current_version, migrate
+
+    url = f'sqlite:///{tmp_path / "workers.db"}'
+    barrier = Barrier(4)
+
+    def boot_worker(_):
+        engine = create_engine(url, connect_args={'timeout': 30})
+        barrier.wait()
+        try:
+            return migrate(engine)
+        finally:
+            engine.dispose()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        applied = list(pool.map(boot_worker, range(4)))
+    assert sorted(version for versions in applied for version in versions) == list(range(1, LATEST_VERSION + 1))
+    assert current_version(create_engine(url)) == LATEST_VERSION
+
+
+def test_postgres_migration_lock_polls_instead_of_blocking():
+    # Concurrent Postgres boots: losers must not sit in pg_advisory_lock holding a
+    # snapshot that CREATE INDEX CONCURRENTLY in the winner would wait on.
+    from app.db.migrations import _acquire_advisory_lock
+
+    statements = []
+    answers = iter([False, False, True])
+
+    class LockConnection:
+        def execute(self, statement, params):
+            statements.append(str(statement))
+            return type('Result', (), {'scalar': lambda _: next(answers)})()
+
+    _acquire_advisory_lock(LockConnection(), poll_seconds=0)
+    assert statements == ['SELECT pg_try_advisory_lock(:id)'] * 3
+
+
+def test_migrations_create_schema_then_skip_when_current(tmp_path):
+    from sqlalchemy import create_engine, inspect, text
+    from app.db.migrations import LATEST_VERSION, current_version, migrate
+
+    engine = create_engine(f'sqlite:///{tmp_path / "fresh.db"}')
+    assert current_version(engine) == 0
+    assert migrate(engine) == list(range(1, LATEST_VERSION + 1))
+    assert current_version(engine) == LATEST_VERSION
+    assert 'email_outbox' in inspect(engine).get_table_names()
+    assert migrate(engine) == []
+
+    # A database from before the runner: tables exist, a later index does not.
+    legacy = create_engine(f'sqlite:///{tmp_path / "legacy.db"}')
+    migrate(legacy)
+    with legacy.begin() as conn:
+        conn.execute(text('DROP TABLE schema_version'))
+        conn.execute(text('DROP INDEX ix_users_created_at_id'))
+    migrate(legacy)
+    assert 'ix_users_created_at_id' in {index['name'] for index in inspect(legacy).get_indexes('users')}
+    assert current_version(legacy) == LATEST_VERSION
+
+
+def test_metrics_endpoint_reports_route_templates(client):
+    from app.core.metrics import registry
+
+    registry.reset()
+    client.get('/health')
+    client.get('/api/users/some-id')
+    client.get('/no-such-path')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/health",status="200"} 1' in body
+    assert 'http_requests_total{method="GET",route="/api/users/{user_id}",status="401"} 1' in body
+    assert 'route="unmatched",status="404"' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/health",le="+Inf"} 1' in body
+    assert 'http_requests_in_flight 1' in body
+
+
+def test_metrics_registry_merges_worker_snapshots(tmp_path):
+    from app.core.metrics import MetricsRegistry, external_call_duration, timed_external
+
+    worker = MetricsRegistry(str(tmp_path))
+    worker.counter('jobs_total', 'Jobs.', ('kind',)).inc(('email',), 2)
+    worker.gauge('queue_depth', 'Queue depth.').set((), 7)
+    worker.flush()
+    # Pretend the snapshot came from another worker that has since exited.
+    (tmp_path / 'metrics-999999999.json').write_text((tmp_path / f'metrics-{os.getpid()}.json').read_text())
+    (tmp_path / f'metrics-{os.getpid()}.json').unlink()
+
+    scraper = MetricsRegistry(str(tmp_path))
+    jobs = scraper.counter('jobs_total', 'Jobs.', ('kind',))
+    jobs.inc(('email',))
+    body = scraper.render()
+    assert 'jobs_total{kind="email"} 3' in body
+    # Gauges from exited workers are dropped; their counters still count.
+    assert 'queue_depth' not in body
+
+    @timed_external('svc', 'op')
+    def failing():
+        return None
+
+    failing()
+    assert sum(external_call_duration.values[('svc', 'op', 'error')][:-1]) == 1
+
+
+def test_importing_app_leaves_external_sdks_unloaded():
+    import subprocess
+    import sys
+
+    code = (
+        'import sys, app.main; '
+        "print(sorted(m for m in ('google.generativeai', 'boto3', 'botocore', 'PIL') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, env=os.environ.copy(), check=True)
+    assert result.stdout.strip() == '[]'
+
+
+def test_provider_builds_once_and_can_be_overridden():
+    from app.core.providers import Provider
+
+    calls = []
+    provider = Provider(lambda: calls.append(1) or object())
+    first = provider.get()
+    assert provider.get() is first
+    assert calls == [1]
+
+    stand_in = object()
+    provider.override(stand_in)
+    assert provider.get() is stand_in
+    provider.override(None)
+    assert provider.get() is not stand_in
+    assert calls == [1, 1]
+
+
+def test_bcrypt_calibrate_floor_and_unmet_target(monkeypatch):
+    from app.core import bcrypt_calibrate
+
+    monkeypatch.setattr(bcrypt_calibrate, 'measure_rounds', lambda rounds, samples: 2.0 ** (rounds - 6))
+    recommended, timings = bcrypt_calibrate.calibrate(100.0)
+    assert min(timings) == bcrypt_calibrate.MIN_ROUNDS
+    assert recommended == 12 and timings[recommended] <= 100.0
+
+    recommended, timings = bcrypt_calibrate.calibrate(10.0)
+    assert recommended == bcrypt_calibrate.MIN_ROUNDS
+    assert timings[recommended] > 10.0
@@ -175,3 +175,90 @@ def test_host_bookings_include_driver_contact(client):
     assert len(payload) == 1
     assert payload[0]['driverPhoneNumber'] == '+919811112266'
     assert payload[0]['stationTitle'] == 'Contact Station'
+
+
+def test_host_bulk_import_stations_csv_and_ndjson(client, monkeypatch):
+    from app.api.routes import host as host_routes
+
+    monkeypatch.setattr(host_routes.settings, 'station_import_chunk_size', 2)
+    headers = auth_headers(client)
+
+    csv_body = '\n'.join([
+        'title,location,connectorType,powerOutput,pricePerHour,lat,lng,supportedVehicleTypes',
+        'Depot Bay 1,Pune,CCS2,60kW,300,18.52,73.85,4W',
+        'Depot Bay 2,Pune,CCS2,60kW,300,18.53,73.86,2W;4W',
+        'X,Pune,CCS2,60kW,300,18.54,73.87,4W',
+        '"Depot Bay 4",Pune,Type 2,7.2kW,150,18.55,73.88,4W'
+    ])
+    response = client.post('/api/host/stations/import', headers={**headers, 'Content-Type': 'text/csv'}, content=csv_body)
+    assert response.status_code == 200
+    body = response.json()
+    assert body['created'] == 3
+    assert [row['status'] for row in body['results']] == ['created', 'created', 'invalid', 'created']
+    assert body['results'][2]['message'].startswith('title')
+
+    ndjson_body = '{"title": "Depot Bay 5", "location": "Pune", "connectorType": "CCS2", "powerOutput": "60kW", "pricePerHour": 300, "lat": 18.5, "lng": 73.8}\nnot json\n'
+    response = client.post('/api/host/stations/import', headers=headers, params={'format': 'ndjson'}, content=ndjson_body)
+    assert [row['status'] for row in response.json()['results']] == ['created', 'invalid']
+
+    stations = {station['title']: station for station in client.get('/api/host/stations', headers=headers).json()}
+    assert set(stations) >= {'Depot Bay 1', 'Depot Bay 2', 'Depot Bay 4', 'Depot Bay 5'}
+    assert stations['Depot Bay 2']['supportedVehicleTypes'] == ['2W', '4W']
+    assert stations['Depot Bay 5']['phoneNumber'] == '+919811112255'
+    assert stations['Depot Bay 5']['image']
+
+    csv_headers = {**headers, 'Content-Type': 'text/csv'}
+    oversized_cell = 'title,location\n' + 'x' * 140000 + ',Pune\n'
+    response = client.post('/api/host/stations/import', headers=csv_headers, content=oversized_cell)
+    assert response.status_code == 200
+    assert response.json()['results'][0]['status'] == 'invalid'
+    response = client.post('/api/host/stations/import', headers=csv_headers, content=b'title\n\xff\xfe\n')
+    assert response.status_code == 400
+    assert response.json()['error']['code'] == 'INVALID_ENCODING'
+
+    monkeypatch.setattr(host_routes.settings, 'station_import_max_rows', 1)
+    response = client.post('/api/host/stations/import', headers=csv_headers, content=csv_body)
+    assert response.status_code == 413
+    monkeypatch.setattr(host_routes.settings, 'import_max_bytes', 64)
+    response = client.post('/api/host/stations/import', headers=csv_headers, content=csv_body)
+    assert response.status_code == 413
+    assert response.json()['error']['code'] == 'PAYLOAD_TOO_LARGE'
+    assert client.post('/api/host/stations/import', headers=headers, content='x').status_code == 415
+
+
+def test_host_bulk_update_stations_cancels_active_bookings(client, query_count):
+    headers = auth_headers(client)
+    ndjson_body = '\n'.join(
+        '{"title": "Site Bay %d", "location": "Pune", "connectorType": "CCS2", "powerOutput": "60kW", '
+        '"pricePerHour": 300, "lat": 18.5, "lng": 73.8}' % index
+        for index in range(3)
+    )
+    results = client.post('/api/host/stations/import', headers=headers, params={'format': 'ndjson'}, content=ndjson_body)
+    station_ids = [row['id'] for row in results.json()['results']]
+
+    driver_headers = {'Authorization': f"Bearer {register_driver(client).json()['tokens']['accessToken']}"}
+    client.put('/api/profile/driver', json={'vehicleType': '4W', 'vehicleModel': 'Tata Nexon EV'}, headers=driver_headers)
+    for station_id in station_ids:
+        booking = client.post('/api/driver/bookings', json={'stationId': station_id, 'startTime': '10:00 AM'}, headers=driver_headers)
+        assert booking.status_code == 200
+
+    response = client.patch('/api/host/stations/bulk', json={
+        'stationIds': station_ids[:2] + ['missing-station'],
+        'status': 'OFFLINE',
+        'pricePerHour': 250
+    }, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert sorted(body['updated']) == sorted(station_ids[:2])
+    assert body['notFound'] == ['missing-station']
+    assert body['cancelledBookings'] == 2
+    assert query_count(response) <= 8
+
+    stations = {station['id']: station for station in client.get('/api/host/stations', headers=headers).json()}
+    assert [stations[station_id]['status'] for station_id in station_ids] == ['OFFLINE', 'OFFLINE', 'AVAILABLE']
+    assert [stations[station_id]['pricePerHour'] for station_id in station_ids] == [250, 250, 300]
+    bookings = client.get('/api/driver/bookings', headers=driver_headers).json()
+    assert sorted(booking['status'] for booking in bookings) == ['ACTIVE', 'CANCELLED', 'CANCELLED']
+
+    empty = client.patch('/api/host/stations/bulk', json={'stationIds': station_ids}, headers=headers)
+    assert empty.status_code == 400
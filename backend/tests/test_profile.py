@@ -44,3 +44,28 @@ def test_host_profile_upsert_and_get(client):
     get_response = client.get('/api/profile/host', headers=headers)
     assert get_response.status_code == 200
     assert get_response.json()['parkingAddress'] == 'Pune'
+
+
+def test_profile_upsert_marks_user_profile_complete(client):
+    headers = auth_headers(client)
+
+    client.put('/api/profile/driver', json={
+        'vehicleType': '2W',
+        'vehicleModel': 'Ather 450X'
+    }, headers=headers)
+
+    me_response = client.get('/api/auth/me', headers=headers)
+    assert me_response.json()['driverProfileComplete'] is True
+    assert me_response.json()['hostProfileComplete'] is False
+
+
+def test_profile_gate_opens_for_the_existing_token_after_upsert(client):
+    headers = auth_headers(client)
+    assert client.get('/api/driver/bookings', headers=headers).status_code == 403
+
+    response = client.put('/api/profile/driver', json={
+        'vehicleType': '4W',
+        'vehicleModel': 'Tata Nexon EV'
+    }, headers=headers)
+    assert 'accessToken' not in response.json()
+    assert client.get('/api/driver/bookings', headers=headers).status_code == 200
@@ -120,3 +120,92 @@ def test_admin_update_duplicate_email(client):
         json={'email': 'usera@example.com'}
     )
     assert response.status_code == 409
+
+
+def test_admin_list_users_cursor_pagination_and_search(client):
+    create_user('adminuser', 'admin3@example.com', 'AdminPass123!', role='admin')
+    for index in range(4):
+        create_user(f'pager{index}', f'pager{index}@example.com', 'UserPass123!')
+    token = login_user(client, 'admin3@example.com', 'AdminPass123!')
+    headers = {'Authorization': f'Bearer {token}'}
+
+    seen = []
+    params = {'limit': 2}
+    while True:
+        body = client.get('/api/users', headers=headers, params=params).json()
+        assert body['total'] == 5
+        seen.extend(user['username'] for user in body['data'])
+        if not body['nextCursor']:
+            break
+        params = {'limit': 2, 'cursor': body['nextCursor']}
+    assert sorted(seen) == sorted(['adminuser', 'pager0', 'pager1', 'pager2', 'pager3'])
+    assert len(seen) == 5
+
+    search = client.get('/api/users', headers=headers, params={'q': 'pager'}).json()
+    assert search['total'] == 4
+    assert client.get('/api/users', headers=headers, params={'q': 'ADMIN3@'}).json()['total'] == 1
+
+    bad = client.get('/api/users', headers=headers, params={'cursor': 'not-a-cursor'})
+    assert bad.status_code == 400
+
+
+def test_admin_bulk_import_users_csv_and_ndjson(client):
+    create_user('adminuser', 'admin4@example.com', 'AdminPass123!', role='admin')
+    create_user('existing', 'existing@example.com', 'UserPass123!')
+    token = login_user(client, 'admin4@example.com', 'AdminPass123!')
+    headers = {'Authorization': f'Bearer {token}'}
+
+    csv_body = '\n'.join([
+        'username,email,password,phoneNumber,role',
+        'fleet1,fleet1@example.com,Password123!,+919800000001,driver',
+        'fleet2,EXISTING@example.com,Password123!,+919800000002,driver',
+        'fleet1,fleet1b@example.com,Password123!,+919800000003,driver',
+        'fleet4,not-an-email,Password123!,+919800000004,driver'
+    ])
+    response = client.post('/api/users/import', headers={**headers, 'Content-Type': 'text/csv'}, content=csv_body)
+    assert response.status_code == 200
+    body = response.json()
+    assert body['created'] == 1
+    assert [row['status'] for row in body['results']] == ['created', 'duplicate', 'duplicate', 'invalid']
+
+    ndjson_body = '{"username": "fleet5", "email": "fleet5@example.com", "password": "Password123!", "phoneNumber": "+919800000005"}\nnot json\n'
+    response = client.post('/api/users/import', headers=headers, params={'format': 'ndjson'}, content=ndjson_body)
+    assert [row['status'] for row in response.json()['results']] == ['created', 'invalid']
+    assert login_user(client, 'fleet5@example.com', 'Password123!')
+
+    assert client.post('/api/users/import', headers=headers, content='x').status_code == 415
+
+    csv_headers = {**headers, 'Content-Type': 'text/csv'}
+    quoted_newline = 'username,email,password,phoneNumber,role\nfleet6,fleet6@example.com,Password123!,+919800000006,"dri\nver"\n'
+    response = client.post('/api/users/import', headers=csv_headers, content=quoted_newline)
+    assert [(row['status'], row['message']) for row in response.json()['results']] == [('invalid', 'Invalid role.')]
+    response = client.post('/api/users/import', headers=csv_headers, content=b'username\n\xff\n')
+    assert response.status_code == 400
+
+
+def test_admin_slow_query_report(client, monkeypatch):
+    from app.core.slow_queries import slow_query_log
+
+    create_user('adminuser', 'admin@example.com', 'AdminPass123!', role='admin')
+    create_user('member1', 'member1@example.com', 'Password123!')
+    admin_headers = {'Authorization': f"Bearer {login_user(client, 'admin@example.com', 'AdminPass123!')}"}
+    member_headers = {'Authorization': f"Bearer {login_user(client, 'member1@example.com', 'Password123!')}"}
+
+    # Treat every statement as slow.
+    monkeypatch.setattr(slow_query_log, 'threshold_ms', 0.000001)
+    client.get('/api/users', headers=admin_headers, params={'q': 'member'})
+
+    assert client.get('/api/admin/slow-queries', headers=member_headers).status_code == 403
+    response = client.get('/api/admin/slow-queries', headers=admin_headers)
+    assert response.status_code == 200
+    entries = response.json()['data']
+    totals = [entry['totalMs'] for entry in entries]
+    assert totals == sorted(totals, reverse=True)
+
+    search = next(entry for entry in entries if 'LIKE' in entry['statement'] or 'users.username >=' in entry['statement'])
+    assert search['routes'] == {'GET /api/users': 1}
+    assert search['plan'] and not search['plan'][0].startswith('(')
+    assert 'member' not in ' '.join(search['plan'])
+    assert 'member' not in search['statement']
+
+    assert client.delete('/api/admin/slow-queries', headers=admin_headers).status_code == 204